@@ -0,0 +1,90 @@
+"""
+여러 회원 계정 자격증명 (keyring, SERVICE_NAME 아래)
+
+    python accounts.py add ID        # 비밀번호는 입력 프롬프트로
+    python accounts.py list
+    python accounts.py remove ID
+
+기본 계정은 GUI 가 쓰는 user_id / user_pw 항목 그대로, 추가 계정은
+"accounts" 항목(아이디 JSON 목록) + "pw:<아이디>" 항목에 저장한다.
+"""
+import sys
+import json
+import getpass
+import argparse
+from typing import List, Optional, Tuple
+
+import keyring
+
+from config import SERVICE_NAME
+
+_ACCOUNTS_KEY = "accounts"
+
+
+def _extra_ids() -> List[str]:
+    raw = keyring.get_password(SERVICE_NAME, _ACCOUNTS_KEY)
+    return json.loads(raw) if raw else []
+
+
+def list_accounts() -> List[str]:
+    """저장된 계정 아이디 (기본 계정 먼저)"""
+    primary = keyring.get_password(SERVICE_NAME, "user_id")
+    ids = [primary] if primary else []
+    return ids + [uid for uid in _extra_ids() if uid != primary]
+
+
+def get_password(user_id: str) -> Optional[str]:
+    if keyring.get_password(SERVICE_NAME, "user_id") == user_id:
+        return keyring.get_password(SERVICE_NAME, "user_pw")
+    return keyring.get_password(SERVICE_NAME, f"pw:{user_id}")
+
+
+def load_accounts(user_ids: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+    """[(아이디, 비밀번호)] — user_ids 생략 시 저장된 전체. 비밀번호가 없는 아이디는 건너뜀"""
+    out = []
+    for uid in user_ids or list_accounts():
+        pw = get_password(uid)
+        if pw:
+            out.append((uid, pw))
+    return out
+
+
+def save_account(user_id: str, password: str):
+    keyring.set_password(SERVICE_NAME, f"pw:{user_id}", password)
+    ids = _extra_ids()
+    if user_id not in ids:
+        keyring.set_password(SERVICE_NAME, _ACCOUNTS_KEY, json.dumps(ids + [user_id]))
+
+
+def remove_account(user_id: str):
+    ids = _extra_ids()
+    if user_id in ids:
+        keyring.set_password(SERVICE_NAME, _ACCOUNTS_KEY, json.dumps([i for i in ids if i != user_id]))
+    try:
+        keyring.delete_password(SERVICE_NAME, f"pw:{user_id}")
+    except keyring.errors.PasswordDeleteError:
+        pass
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="예약용 회원 계정 관리 (keyring)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("add").add_argument("user_id")
+    sub.add_parser("remove").add_argument("user_id")
+    sub.add_parser("list")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "add":
+        save_account(args.user_id, getpass.getpass(f"{args.user_id} 비밀번호: "))
+        print(f"{args.user_id} 저장 완료")
+    elif args.cmd == "remove":
+        remove_account(args.user_id)
+        print(f"{args.user_id} 삭제 완료")
+    else:
+        for uid in list_accounts():
+            print(uid + ("" if get_password(uid) else "  (비밀번호 없음)"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
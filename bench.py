@@ -0,0 +1,408 @@
+"""
+성능 측정 스크립트 (실서버 대신 저장해 둔 작성 페이지 URL/파일로도 실행 가능)
+
+    python bench.py pick --latency 20 --runs 50                # 시간 선택+제출 (대역 서버)
+    python bench.py open --date 2025-06-01 --user ID --password PW
+    python bench.py suite --engines http browser --latency 30 --jitter 10 --runs 30
+    python bench.py parse --files saved_write.html --runs 200   # 생략 시 대역 서버 페이지로 생성
+    python bench.py sessions --n 4 --headless               # Chrome 여러 개 vs 컨텍스트 공유
+    python bench.py startup --runs 5                      # python main.py
+    python bench.py startup --exe dist/TennisReserver.exe # 빌드한 실행 파일
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+# --------- 공용 ---------
+
+def percentiles(values):
+    """p50/p95/p99 (ms)"""
+    if not values:
+        return {"n": 0}
+    ordered = sorted(values)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        "n": len(values),
+        "p50": pct(50) * 1000,
+        "p95": pct(95) * 1000,
+        "p99": pct(99) * 1000,
+        "mean": statistics.fmean(values) * 1000,
+    }
+
+
+def report(name: str, values):
+    st = percentiles(values)
+    if not st["n"]:
+        print(f"{name:<28} (no samples)")
+        return
+    print(f"{name:<28} n={st['n']:<4} p50={st['p50']:8.2f}ms  p95={st['p95']:8.2f}ms  "
+          f"p99={st['p99']:8.2f}ms  mean={st['mean']:8.2f}ms")
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - t0
+
+
+# --------- 시간 선택 + 제출: 기존 경로 vs 단일 스크립트 ---------
+
+def bench_pick(args):
+    """대역 서버에 실제로 제출까지: pick_time + fill_and_submit_form (WebDriver 명령 여러 번) vs pick_and_submit 1회"""
+    import datetime as dt
+    from mock_server import MockSite, serve, season_hours
+
+    site = MockSite(latency=args.latency / 1000, jitter=args.jitter / 1000, seed=args.seed)
+    server = serve(site)
+    os.environ["TENNIS_BASE_URL"] = server.base_url
+    from driver import build_driver
+    from booking import login, open_write_page, try_select_time_and_submit
+
+    target_date = dt.date.today() + dt.timedelta(days=15)
+    hours = args.hours or [h[:2] for h in season_hours(target_date)[:3]]
+    form_data = {"resident": "관내", "phone": "010-1234-5678", "companion_count": 0, "companions": []}
+    driver = build_driver(headless=args.headless)
+    res = {False: [], True: []}     # single_call → 소요 시간
+    fails = {False: 0, True: 0}
+    try:
+        login(driver, "bench", "pw")
+        for _ in range(args.runs):
+            for single in (False, True):
+                site.reset(open_at=time.time() - 1)
+                open_write_page(driver, 1, target_date)
+                t0 = time.perf_counter()
+                if try_select_time_and_submit(driver, hours, form_data, single_call=single):
+                    res[single].append(time.perf_counter() - t0)
+                else:
+                    fails[single] += 1
+    finally:
+        driver.quit()
+        server.shutdown()
+
+    report("pick_time + fill_and_submit", res[False])
+    report("pick_and_submit (1 script)", res[True])
+    print(f"{'submit failures':<28} legacy={fails[False]} single={fails[True]}")
+
+
+# --------- 작성 페이지 열기: 기본 프로필 vs race 프로필 ---------
+
+def bench_open(args):
+    import datetime as dt
+    from driver import build_driver
+    from booking import login, open_write_page
+
+    target_date = dt.date.fromisoformat(args.date)
+    for profile in ("default", "race"):
+        driver = build_driver(headless=args.headless, profile=profile)
+        samples = []
+        try:
+            if args.user:
+                login(driver, args.user, args.password)
+            for _ in range(args.runs):
+                samples.append(timed(open_write_page, driver, args.office, target_date))
+        finally:
+            driver.quit()
+        report(f"open_write_page [{profile}]", samples)
+
+
+# --------- 로컬 대역 서버 기반 엔드투엔드 측정 ---------
+
+def _make_engine(name: str, headless: bool):
+    if name == "http":
+        import http_booking
+        return http_booking, http_booking.HttpClient()
+    import booking
+    from driver import build_driver
+    return booking, build_driver(headless=headless, profile="race" if name == "race" else "default")
+
+
+def bench_suite(args):
+    import datetime as dt
+    from mock_server import MockSite, serve, season_hours
+
+    site = MockSite(latency=args.latency / 1000, jitter=args.jitter / 1000,
+                    deplete_per_sec=args.deplete, seed=args.seed)
+    server = serve(site)
+    # 엔진 모듈이 config 를 import 하기 전에 대역 서버 주소를 지정해야 함
+    os.environ["TENNIS_BASE_URL"] = server.base_url
+    from booking import wait_until
+    from utils import NoAvailablePreferredTime
+
+    target_date = dt.date.today() + dt.timedelta(days=15)
+    hours = args.hours or [h[:2] for h in season_hours(target_date)[:4]]
+    form_data = {"resident": "관내", "phone": "010-1234-5678", "companion_count": 0, "companions": []}
+    print(f"mock site {server.base_url}  latency={args.latency}ms jitter={args.jitter}ms deplete={args.deplete}/s")
+
+    for name in args.engines:
+        try:
+            engine, handle = _make_engine(name, args.headless)
+        except Exception as e:
+            print(f"[{name}] 건너뜀: {e}")
+            continue
+        res = {k: [] for k in ("login", "open_write_page", "pick_time", "fill_and_submit_form", "time_to_submit")}
+        try:
+            # 단계별 측정은 소진 없이, 전체 시간(time_to_submit)만 경쟁자 소진을 적용
+            site.deplete_per_sec = 0.0
+            site.reset(open_at=time.time() - 1)
+            for _ in range(args.runs):
+                res["login"].append(timed(engine.login, handle, "bench", "pw"))
+            for _ in range(args.runs):
+                res["open_write_page"].append(timed(engine.open_write_page, handle, 1, target_date))
+            for _ in range(args.runs):
+                res["pick_time"].append(timed(engine.pick_time, handle, hours))
+            for _ in range(args.runs):
+                site.reset()
+                engine.open_write_page(handle, 1, target_date)
+                engine.pick_time(handle, hours)
+                res["fill_and_submit_form"].append(timed(
+                    engine.fill_and_submit_form, handle, resident=form_data["resident"], phone=form_data["phone"],
+                    companion_count=0, companions=[]))
+            site.deplete_per_sec = args.deplete
+            for _ in range(args.runs):
+                site.reset(open_at=time.time() + 0.3)
+                wait_until(dt.datetime.fromtimestamp(site.open_at))
+                t0 = time.perf_counter()
+                try:
+                    ok = engine.fast_retry_loop(handle, 1, target_date, hours, form_data, retry_seconds=10)
+                except NoAvailablePreferredTime:
+                    ok = False
+                if ok:
+                    res["time_to_submit"].append(time.perf_counter() - t0)
+        finally:
+            handle.quit()
+
+        print(f"\n[{name}]")
+        for phase, values in res.items():
+            report(phase, values)
+        won = len(res["time_to_submit"])
+        print(f"{'win rate':<28} {won}/{args.runs}")
+
+    server.shutdown()
+
+
+# --------- 슬롯 파싱: bs4 vs slot_parser ---------
+
+def _parse_fixtures(args):
+    """저장해 둔 작성 페이지들, 없으면 대역 서버 렌더러로 시즌별 페이지 생성 (--pad KB 만큼 메뉴/본문 흉내)"""
+    if args.files:
+        fixtures = {}
+        for path in args.files:
+            with open(path, "rb") as f:
+                fixtures[os.path.basename(path)] = f.read().decode("utf-8", "replace")
+        return fixtures
+
+    import datetime as dt
+    from mock_server import render_write, season_hours
+
+    pad = '<li><a href="/bbs/board.php?bo_table=notice&amp;wr_id=1">공지사항 안내</a></li>' * (args.pad * 14)
+    fixtures = {}
+    for month in (1, 7):
+        date = dt.date(2025, month, 15)
+        hours = season_hours(date)
+        slots = {h: ix % 3 != 0 for ix, h in enumerate(hours)}
+        page = render_write(1, date, slots, "0123456789abcdef").decode("utf-8")
+        page = page.replace("<body>", f'<body><div id="hd"><ul class="gnb">{pad}</ul></div>', 1)
+        page = page.replace("</form>", f'</form><div id="ft"><ul>{pad}</ul></div>', 1)
+        fixtures[f"write_{month:02d}.html ({len(page) // 1024}KB)"] = page
+    return fixtures
+
+
+def bench_parse(args):
+    from bs4 import BeautifulSoup
+    from monitor import booking_time_slots
+    from slot_parser import parse_slots
+
+    def bs4_slots(html):
+        # 기존 http_booking.pick_time / parse_with_bs4 경로: 전체 트리 생성 후 라디오 탐색
+        box = BeautifulSoup(html, "html.parser").find(id="booking_time")
+        return {r.get("value"): not r.has_attr("disabled")
+                and "disabled" not in (r.find_parent("li").get("class") or [])
+                for r in box.find_all("input", attrs={"name": "wr_2"})}
+
+    def chunked(data: bytes, size=8192):
+        return (data[i:i + size] for i in range(0, len(data), size))
+
+    for name, html in _parse_fixtures(args).items():
+        expected = bs4_slots(html)
+        assert parse_slots(html).available() == expected, f"{name}: slot_parser 결과가 bs4 와 다름"
+        assert booking_time_slots(html) == expected
+        raw = html.encode("utf-8")
+        print(f"\n[{name}] slots={len(expected)}")
+        report("bs4 full page", [timed(bs4_slots, html) for _ in range(args.runs)])
+        report("slot_parser (stop early)", [timed(parse_slots, html) for _ in range(args.runs)])
+        report("slot_parser (full form)", [timed(parse_slots, html, stop_early=False) for _ in range(args.runs)])
+        report("slot_parser (8KB chunks)", [timed(parse_slots, chunked(raw)) for _ in range(args.runs)])
+
+
+# --------- 세션 여러 개: Chrome 인스턴스 vs 공유 Chrome 컨텍스트 ---------
+
+def _process_memory(pids):
+    """pids 와 그 자식 프로세스 전체 메모리 (MB). USS(고유 메모리) 우선, psutil 이 없으면 None"""
+    try:
+        import psutil  # 측정할 때만 필요한 선택 의존성
+    except ImportError:
+        return None
+    seen, total = set(), 0
+    for pid in pids:
+        try:
+            procs = [psutil.Process(pid)]
+            procs += procs[0].children(recursive=True)
+        except psutil.Error:
+            continue
+        for p in procs:
+            if p.pid in seen:
+                continue
+            seen.add(p.pid)
+            try:
+                info = p.memory_full_info()
+                total += getattr(info, "uss", info.rss)
+            except psutil.Error:
+                try:
+                    total += p.memory_info().rss
+                except psutil.Error:
+                    pass
+    return total / 2**20
+
+
+def bench_sessions(args):
+    from mock_server import MockSite, serve
+
+    server = serve(MockSite())
+    url = args.url or server.base_url + "/bbs/board.php?bo_table=booking"
+    from driver import build_driver
+    from sessions import SessionManager
+    profile = "race" if args.race else "default"
+
+    def pids(drivers):
+        return [d.service.process.pid for d in drivers if getattr(d.service, "process", None)]
+
+    for mode in ("separate", "shared"):
+        launch, handles, manager = [], [], None
+        try:
+            for i in range(args.n):
+                t0 = time.perf_counter()
+                if mode == "separate":
+                    h = build_driver(headless=args.headless, profile=profile)
+                elif manager is None:
+                    manager = SessionManager.start(headless=args.headless, profile=profile)
+                    h = manager.driver
+                else:
+                    h = manager.new_session()
+                h.get(url)
+                launch.append(time.perf_counter() - t0)
+                handles.append(h)
+            mem = _process_memory(pids(handles))
+        finally:
+            if manager is not None:
+                manager.quit()
+            else:
+                for h in handles:
+                    h.quit()
+
+        print(f"\n[{mode}] sessions={args.n} profile={profile}")
+        report("launch (first)", launch[:1])
+        report("launch (each extra)", launch[1:])
+        if mem is None:
+            print("memory                       (psutil 미설치 — pip install psutil)")
+        else:
+            print(f"{'memory total':<28} {mem:8.1f}MB  per session {mem / args.n:8.1f}MB")
+
+    server.shutdown()
+
+
+# --------- 실행 파일 시작 시간 ---------
+
+def bench_startup(args):
+    """프로세스 시작 → 창 표시 / 브라우저 준비 완료까지 (GUI 가 TENNIS_STARTUP_PROBE 파일에 시각 기록)"""
+    cmd = [args.exe] if args.exe else [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                   "main.py")]
+    res = {"window": [], "driver": []}
+    for _ in range(args.runs):
+        fd, probe = tempfile.mkstemp(suffix=".probe")
+        os.close(fd)
+        t0 = time.time()
+        proc = subprocess.Popen(cmd, env={**os.environ, "TENNIS_STARTUP_PROBE": probe})
+        try:
+            proc.wait(timeout=args.timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            print("시간 초과 — 이번 회차 건너뜀")
+        with open(probe, encoding="utf-8") as f:
+            marks = dict(line.split() for line in f if line.strip())
+        os.remove(probe)
+        for stage in res:
+            if stage in marks:
+                res[stage].append(float(marks[stage]) - t0)
+
+    print(f"[{' '.join(cmd)}]")
+    report("time_to_window", res["window"])
+    report("time_to_driver_ready", res["driver"])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="tennis-macro benchmarks")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("pick", help="시간 선택+제출: WebDriver 명령 여러 번 vs 단일 execute_script (대역 서버)")
+    p.add_argument("--hours", nargs="+", help="기본: 예약일 시즌의 앞 3개 시간")
+    p.add_argument("--latency", type=float, default=20.0, help="ms")
+    p.add_argument("--jitter", type=float, default=5.0, help="ms")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--runs", type=int, default=30)
+    p.add_argument("--headless", action="store_true")
+    p.set_defaults(func=bench_pick)
+
+    p = sub.add_parser("open", help="open_write_page 지연: default vs race 프로필")
+    p.add_argument("--date", required=True, help="예약일 YYYY-MM-DD")
+    p.add_argument("--office", type=int, default=1)
+    p.add_argument("--user")
+    p.add_argument("--password")
+    p.add_argument("--runs", type=int, default=20)
+    p.add_argument("--headless", action="store_true")
+    p.set_defaults(func=bench_open)
+
+    p = sub.add_parser("suite", help="로컬 대역 서버로 단계별/전체 지연 측정 (엔진 비교)")
+    p.add_argument("--engines", nargs="+", default=["http", "race", "browser"],
+                   help="http | browser | race")
+    p.add_argument("--hours", nargs="+", help="기본: 예약일 시즌의 앞 4개 시간")
+    p.add_argument("--latency", type=float, default=20.0, help="ms")
+    p.add_argument("--jitter", type=float, default=5.0, help="ms")
+    p.add_argument("--deplete", type=float, default=0.0, help="오픈 후 초당 소진 슬롯 수")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--runs", type=int, default=20)
+    p.add_argument("--headless", action="store_true")
+    p.set_defaults(func=bench_suite)
+
+    p = sub.add_parser("parse", help="작성 페이지 슬롯 파싱: bs4 vs slot_parser")
+    p.add_argument("--files", nargs="+", help="저장한 작성 페이지 HTML (기본: 대역 서버 렌더러로 생성)")
+    p.add_argument("--pad", type=int, default=60, help="생성 페이지에 덧붙일 메뉴/본문 크기 (KB)")
+    p.add_argument("--runs", type=int, default=200)
+    p.set_defaults(func=bench_parse)
+
+    p = sub.add_parser("sessions", help="세션 N개: Chrome 여러 개 vs 공유 Chrome 컨텍스트 (기동 시간/메모리)")
+    p.add_argument("--n", type=int, default=4, help="세션 수")
+    p.add_argument("--url", help="각 세션이 열 페이지 (기본: 대역 서버 목록 페이지)")
+    p.add_argument("--race", action="store_true", help="race 프로필로 비교")
+    p.add_argument("--headless", action="store_true")
+    p.set_defaults(func=bench_sessions)
+
+    p = sub.add_parser("startup", help="GUI 시작 → 창 표시 / 브라우저 준비 시간")
+    p.add_argument("--exe", help="빌드한 실행 파일 (기본: python main.py)")
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--timeout", type=float, default=60.0, help="회차당 최대 대기 (초)")
+    p.set_defaults(func=bench_startup)
+
+    args = ap.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,51 @@
 import time
 import datetime as dt
-from typing import List
+from typing import List, Optional
 
-from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
 
 from config import LOGIN_URL, WRITE_URL_TMPL
 from utils import NoAvailablePreferredTime
-from driver import hide_popups
+import tracing
+from tracing import traced
+from retry_policy import FixedRetry, run_retry_loop
+from driver import build_driver, hide_popups, wait_write_ready
+from slot_parser import SlotPage, parse_slots
 
 
 # --------- 공용 유틸 ---------
 
-def wait_until(target_dt: dt.datetime):
+def wait_until(target_dt: dt.datetime, *, offset: float = 0.0, lead: float = 0.0,
+               spin: float = 0.05) -> float:
     """
-    target_dt 까지 현재 PC 시각으로 대기
+    서버 시각 target_dt 에 맞춰 발사할 때까지 대기
+    - offset: 서버 - PC 시계 차이(초), lead: 미리 쏠 시간(초, 보통 RTT/2 + 보정)
+    - 남은 시간이 spin 이하가 되면 sleep 대신 perf_counter 로 바쁜 대기
+    반환값: 실제 발사 오차(초, +면 늦음)
     """
+    fire_at = target_dt.timestamp() - offset - lead
     while True:
-        now = dt.datetime.now()
-        delta = (target_dt - now).total_seconds()
-        if delta <= 0:
-            return
-        # 남은 시간이 3초 이내면 짧게, 아니면 1초씩 대기
-        time.sleep(0.2 if delta < 3 else 1.0)
+        delta = fire_at - time.time()
+        if delta <= spin:
+            break
+        # 멀면 1초씩, 가까우면 spin 구간 직전까지만 잔다
+        time.sleep(min(1.0, delta - spin))
+
+    deadline = time.perf_counter() + max(0.0, fire_at - time.time())
+    while time.perf_counter() < deadline:
+        pass
+    err = time.time() - fire_at
+    tracing.event("wait_until", target=target_dt.isoformat(), offset_ms=offset * 1000,
+                  lead_ms=lead * 1000, error_ms=err * 1000)
+    return err
 
 def compute_open_time(target_date: dt.date) -> dt.datetime:
     """
     예약 오픈 = 예약일의 15일 전 00:00
-    → PC의 현재 로컬 시각 기준
+    → 서버 시각 기준 (PC 시계와의 차이는 wait_until 의 offset 으로 보정)
     """
     open_day = target_date - dt.timedelta(days=15)
     return dt.datetime(open_day.year, open_day.month, open_day.day, 0, 0, 0)
@@ -39,6 +55,7 @@ def compute_open_time(target_date: dt.date) -> dt.datetime:
 
 # --------- 페이지 동작 ---------
 
+@traced("login")
 def login(driver, user_id: str, password: str, timeout: int = 20):
     """로그인 페이지로 이동 → 로그인"""
     driver.get(LOGIN_URL)
@@ -52,28 +69,87 @@ def login(driver, user_id: str, password: str, timeout: int = 20):
 
     login_btn = driver.find_element(By.ID, "ol_submit")
     login_btn.click()
-    time.sleep(1.0)
-    hide_popups(driver)
-    return True  # 필요시 상단 "로그아웃" 존재 여부로 성공 판정 로직 보강 가능
+    # 상단 "로그아웃" 링크가 보이면 성공
+    try:
+        WebDriverWait(driver, 5, poll_frequency=0.1).until(lambda d: d.execute_script(_LOGGED_IN_JS))
+    except TimeoutException:
+        return False
+    finally:
+        hide_popups(driver)
+    return True
+
+
+
+_LOGGED_IN_JS = "return !!document.querySelector('a[href*=\"logout\"]');"
+
+
+def check_login(driver) -> bool:
+    """로그인 유지 여부 확인 (로그인 페이지를 다시 받아 keep-alive 역할도 겸함)"""
+    driver.get(LOGIN_URL)
+    return bool(driver.execute_script(_LOGGED_IN_JS))
+
+
+def prewarm(driver, connections: int = 2, timeout: float = 5):
+    """오픈 직전 같은 출처로 HEAD 요청을 보내 브라우저 소켓 풀에 연결을 미리 열어 둔다"""
+    driver.set_script_timeout(timeout)
+    driver.execute_async_script("""
+        const [n, done] = [arguments[0], arguments[arguments.length - 1]];
+        const reqs = Array.from({length: n}, () => fetch('/', {method: 'HEAD', cache: 'no-store'}).catch(() => null));
+        Promise.all(reqs).then(() => done(true));
+    """, connections)
+
 
 
+def clone_session(driver, headless: bool = False):
+    """로그인된 driver 의 쿠키를 옮겨 담은 새 브라우저 (병렬 작업자용)
+    sessions.SessionManager 에 속한 driver 면 같은 Chrome 안의 새 컨텍스트로 만든다"""
+    manager = getattr(driver, "session_manager", None)
+    if manager is not None:
+        clone = manager.new_session()
+    else:
+        profile = "race" if getattr(driver, "race_profile", False) else "default"
+        clone = build_driver(headless=headless, profile=profile)
+    clone.get(LOGIN_URL)
+    for c in driver.get_cookies():
+        clone.add_cookie({k: c[k] for k in ("name", "value", "path", "domain", "secure", "expiry") if k in c})
+    return clone
 
+
+
+@traced("open_write_page")
 def open_write_page(driver, office_no: int, target_date: dt.date, timeout: int = 20):
     """예약 작성 페이지 open"""
     url = WRITE_URL_TMPL.format(office_no=office_no, date=target_date.strftime("%Y-%m-%d"))
     driver.get(url)
+    if getattr(driver, "race_profile", False):
+        wait_write_ready(driver, timeout)
+        return True
     hide_popups(driver)
     WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.ID, "fwrite")))
     return True
 
 
 
-def parse_with_bs4(driver):
-    """필요 시 BeautifulSoup 보조 파싱"""
-    return BeautifulSoup(driver.page_source, "html.parser")
+# 전체 page_source 대신 #booking_time (+ fwrite hidden 토큰) 조각만 WebDriver 로 가져온다
+_SLOT_FRAGMENT_JS = r"""
+const box = document.getElementById('booking_time');
+if (!box) return null;
+const form = document.getElementById('fwrite');
+if (!form) return box.outerHTML;
+if (arguments[0]) return form.outerHTML;
+const hidden = Array.from(form.querySelectorAll('input[type="hidden"]'), e => e.outerHTML).join('');
+return '<form id="fwrite" action="' + (form.getAttribute('action') || '') + '">' + hidden + box.outerHTML + '</form>';
+"""
+
+
+def read_slots(driver, full_form: bool = False) -> Optional[SlotPage]:
+    """현재 페이지의 슬롯 목록 + hidden 토큰 (full_form 이면 폼 기본값 전체). #booking_time 이 없으면 None"""
+    html = driver.execute_script(_SLOT_FRAGMENT_JS, full_form)
+    return parse_slots(html, stop_early=not full_form) if html else None
 
 
 
+@traced("pick_time")
 def pick_time(driver, preferred_hours: List[str], timeout: int = 10) -> bool:
     """
     - 선호 시간 라디오가 존재하되 모두 disabled면 NoAvailablePreferredTime 발생
@@ -81,6 +157,7 @@ def pick_time(driver, preferred_hours: List[str], timeout: int = 10) -> bool:
     """
     wait = WebDriverWait(driver, timeout)
     wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#booking_time")))
+    driver.selected_time = None
 
     seen_preferred = False          # 선호 시간 라디오를 발견했는지
     selectable_found = False        # 클릭 가능한 선호 슬롯을 찾았는지
@@ -118,6 +195,7 @@ def pick_time(driver, preferred_hours: List[str], timeout: int = 10) -> bool:
             driver.execute_script("arguments[0].click();", r)
 
         if r.is_selected():
+            driver.selected_time = val  # http_booking.HttpClient.selected_time 과 같은 의미
             return True
 
     # 선호 시간 라디오들은 있었는데 모두 disabled였다면 → 즉시 실패 신호
@@ -129,6 +207,7 @@ def pick_time(driver, preferred_hours: List[str], timeout: int = 10) -> bool:
 
 
 
+@traced("fill_and_submit_form")
 def fill_and_submit_form(
     driver,
     *,
@@ -174,8 +253,240 @@ def fill_and_submit_form(
 
 
 
-def try_select_time_and_submit(driver, preferred_times, form_data, timeout: int = 10) -> bool:
+# 페이지에 주입하는 공용 JS 함수들 (scanSlots / pickSlot / fillForm)
+_SLOT_JS_LIB = r"""
+function scanSlots(root) {
+    const avail = {};
+    root.querySelectorAll('#booking_time input[type="radio"][name="wr_2"]').forEach(r => {
+        const li = r.closest('li');
+        avail[r.value] = !r.disabled && !(li && li.classList.contains('disabled'));
+    });
+    return avail;
+}
+function pickSlot(hours, avail) {
+    // clickFailed: 선택 가능한 슬롯을 눌렀는데 체크가 안 됨 → 마감이 아니라 일반 실패(재시도)
+    let seen = false, clickFailed = false;
+    for (const hh of hours) {
+        const val = hh + ':00';
+        if (!(val in avail)) continue;
+        seen = true;
+        if (!avail[val]) continue;
+        const r = document.querySelector(`#booking_time input[type="radio"][name="wr_2"][value="${val}"]`);
+        const label = r.id ? document.querySelector(`label[for="${r.id}"]`) : null;
+        (label || r).click();
+        if (r.checked) return {picked: val, seen: true, clickFailed: false};
+        clickFailed = true;
+    }
+    return {picked: null, seen: seen, clickFailed: clickFailed};
+}
+function fillForm(form) {
+    const set = (el, v) => {
+        if (!el) return;
+        el.value = v;
+        el.dispatchEvent(new Event('input', {bubbles: true}));
+        el.dispatchEvent(new Event('change', {bubbles: true}));
+    };
+    const resident = document.querySelector(`input[name="wr_4"][value="${form.resident}"]`);
+    if (resident && !resident.checked) resident.click();
+    set(document.querySelector('[name="wr_5"]'), String(form.companion_count));
+    set(document.querySelector('[name="wr_6"]'), form.companions);
+    set(document.querySelector('[name="wr_subject"]'), form.phone);
+    const agree = document.getElementById('agree');
+    if (agree && !agree.checked) agree.click();
+}
+"""
+
+# 한 번의 execute_script 로 슬롯 스캔 → 선택 → 폼 입력 → 제출까지 처리
+# (WebDriver 명령마다 chromedriver 왕복이 생기므로 임계 경로를 1회 호출로 줄임)
+_PICK_AND_SUBMIT_JS = _SLOT_JS_LIB + r"""
+const [hours, form, dryRun] = arguments;
+const avail = scanSlots(document);
+const {picked, seen, clickFailed} = pickSlot(hours, avail);
+if (!picked) return {status: clickFailed ? 'click_failed' : seen ? 'all_disabled' : 'missing', avail: avail, picked: null};
+if (dryRun) return {status: 'picked', avail: avail, picked: picked};
+fillForm(form);
+document.getElementById('btn_submit').click();
+return {status: 'submitted', avail: avail, picked: picked};
+"""
+
+# 캐시된 슬롯 배치(slot_layout)의 라디오/라벨 id 로 바로 선택 → 폼 입력 → 제출 (시간별 검색 없음)
+# 살아 있는 wr_2 목록(값, id)이 캐시와 하나라도 다르면 'mismatch' — 호출 측이 try_select_time_and_submit 으로 넘어간다
+_LAYOUT_SUBMIT_JS = _SLOT_JS_LIB + r"""
+const [cached, slots, form] = arguments;
+const live = Array.from(document.querySelectorAll('#booking_time input[type="radio"][name="wr_2"]'),
+                        r => r.value + '\n' + r.id);
+if (live.join('\t') !== cached.map(([val, inputId]) => val + '\n' + inputId).join('\t')) {
+    return {status: 'mismatch', picked: null};
+}
+let clickFailed = false;
+for (const [val, inputId, labelId] of slots) {
+    const r = document.getElementById(inputId);
+    const li = r.closest('li');
+    if (r.disabled || (li && li.classList.contains('disabled'))) continue;
+    ((labelId && document.getElementById(labelId)) || r).click();
+    if (!r.checked) { clickFailed = true; continue; }
+    fillForm(form);
+    document.getElementById('btn_submit').click();
+    return {status: 'submitted', picked: val};
+}
+return {status: clickFailed ? 'click_failed' : 'all_disabled', picked: null};
+"""
+
+# 페이지 안에서 fetch() 로 작성 페이지를 다시 받아 #booking_time 만 비교 (내비게이션 없음)
+# 선호 슬롯이 열리면 #booking_time / hidden 토큰을 최신 값으로 바꿔 끼우고 즉시 제출
+_INPAGE_WATCH_JS = _SLOT_JS_LIB + r"""
+const [hours, form, intervalMs, timeoutMs, fragmentUrl] = arguments;
+const done = arguments[arguments.length - 1];
+const url = fragmentUrl || location.href;
+const deadline = performance.now() + timeoutMs;
+const wanted = hours.map(h => h + ':00');
+let polls = 0;
+fillForm(form);
+
+async function tick() {
+    polls++;
+    try {
+        const resp = await fetch(url, {cache: 'no-store', credentials: 'same-origin'});
+        const doc = new DOMParser().parseFromString(await resp.text(), 'text/html');
+        const box = doc.getElementById('booking_time');
+        if (box) {
+            const avail = scanSlots(doc);
+            if (wanted.some(v => avail[v])) {
+                document.getElementById('booking_time').innerHTML = box.innerHTML;
+                doc.querySelectorAll('#fwrite input[type="hidden"]').forEach(h => {
+                    const cur = document.querySelector(`#fwrite input[type="hidden"][name="${h.name}"]`);
+                    if (cur) cur.value = h.value;
+                });
+                const {picked} = pickSlot(hours, scanSlots(document));
+                if (picked) {
+                    fillForm(form);
+                    document.getElementById('btn_submit').click();
+                    return done({status: 'submitted', avail: avail, picked: picked, polls: polls});
+                }
+            }
+        }
+    } catch (e) { /* 일시적 네트워크 오류는 다음 주기에 재시도 */ }
+    if (performance.now() >= deadline) return done({status: 'timeout', avail: null, picked: null, polls: polls});
+    setTimeout(tick, intervalMs);
+}
+tick();
+"""
+
+
+def _form_payload(form_data) -> dict:
+    """주입 스크립트용 폼 값 (fill_and_submit_form 과 같은 규칙)"""
+    companion_count = int(form_data.get("companion_count", 0))
+    companions = form_data.get("companions", [])
+    return {
+        "resident": form_data["resident"],
+        "phone": form_data["phone"],
+        "companion_count": companion_count,
+        "companions": (", ".join(companions) if companions else "동반자미상") if companion_count > 0 else "",
+    }
+
+
+@traced("pick_and_submit")
+def pick_and_submit(driver, preferred_hours: List[str], form_data, dry_run: bool = False) -> dict:
+    """
+    pick_time + fill_and_submit_form 을 한 번의 driver 호출로 수행.
+    반환: {"status": submitted|picked|all_disabled|click_failed|missing, "avail": {"06:00": True, ...},
+           "picked": "06:00"}
+    """
+    return driver.execute_script(_PICK_AND_SUBMIT_JS, list(preferred_hours), _form_payload(form_data), dry_run)
+
+
+
+
+@traced("submit_from_layout")
+def submit_from_layout(driver, layout, office_no: int, target_date: dt.date, preferred_times, form_data,
+                       timeout: int = 10) -> Optional[bool]:
+    """
+    작성 페이지를 열고 캐시된 슬롯 배치(slot_layout.SlotLayout)대로 바로 선택·제출 (execute_script 1회).
+    True/False: 제출 결과 (선택 클릭이 안 먹은 경우도 False → 재시도)
+    None: 배치에 선호 시간이 없거나 살아 있는 슬롯 목록이 캐시와 다름
+    (None 이면 작성 페이지는 열린 상태 → 호출 측이 try_select_time_and_submit 으로 이어서)
+    """
+    open_write_page(driver, office_no, target_date, timeout=timeout)
+    slots = layout.preferred(preferred_times)
+    if not slots:
+        return None
+    try:
+        res = driver.execute_script(_LAYOUT_SUBMIT_JS, layout.slots, slots, _form_payload(form_data))
+    except WebDriverException:
+        return None
+    driver.selected_time = res.get("picked")
+    if res["status"] == "mismatch":
+        return None
+    if res["status"] == "click_failed":
+        return False
+    if res["status"] == "all_disabled":
+        raise NoAvailablePreferredTime("선호한 시간대가 모두 예약 불가(disabled)입니다.")
+    try:
+        WebDriverWait(driver, 5).until(lambda d: "write.php" not in d.current_url)
+        return True
+    except Exception:
+        return False
+
+
+def prefill_static_fields(driver, form_data):
+    """주거지/인원/동반자/연락처/동의를 미리 채워 둔다 (제출은 안 함)"""
+    driver.execute_script(_SLOT_JS_LIB + "fillForm(arguments[0]);", _form_payload(form_data))
+
+
+def preload_write_page(driver, office_no: int, target_date: dt.date, form_data, timeout: int = 20):
+    """오픈 전에 작성 페이지를 열고 고정 입력값을 채워 둔다"""
+    open_write_page(driver, office_no, target_date, timeout=timeout)
+    prefill_static_fields(driver, form_data)
+    return True
+
+
+@traced("inpage_race")
+def inpage_race(driver, preferred_hours: List[str], form_data, interval_ms: int = 100,
+                retry_seconds: int = 60, fragment_url: str = None) -> bool:
+    """
+    preload_write_page 로 열어 둔 페이지 안에서 가용 슬롯을 폴링하다가 열리는 즉시 제출.
+    경쟁 중 페이지 이동이 없으므로 시도 1회 비용 ≈ fetch 1회.
+    """
+    driver.set_script_timeout(retry_seconds + 10)
+    res = driver.execute_async_script(
+        _INPAGE_WATCH_JS, list(preferred_hours), _form_payload(form_data),
+        int(interval_ms), int(retry_seconds * 1000), fragment_url,
+    )
+    if res["status"] != "submitted":
+        return False
+    try:
+        WebDriverWait(driver, 5).until(lambda d: "write.php" not in d.current_url)
+        return True
+    except Exception:
+        return False
+
+
+
+
+@traced("try_select_time_and_submit")
+def try_select_time_and_submit(driver, preferred_times, form_data, timeout: int = 10,
+                               single_call: bool = True) -> bool:
     """시간 선택 → 폼 채움 → 제출. 실패 시 False / 선호 전부 불가면 NoAvailablePreferredTime 예외 전달"""
+    if single_call:
+        # 기존 pick_time 과 같이 #booking_time 이 뜰 때까지 기다린 뒤 한 번에 처리
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, "#booking_time")))
+        try:
+            res = pick_and_submit(driver, preferred_times, form_data)
+        except WebDriverException:
+            driver.selected_time = None
+            return False  # 스크립트 오류(페이지 이동 중 등) → 일반 실패로 재시도
+        driver.selected_time = res.get("picked")
+        if res["status"] == "all_disabled":
+            raise NoAvailablePreferredTime("선호한 시간대가 모두 예약 불가(disabled)입니다.")
+        if res["status"] != "submitted":
+            return False
+        try:
+            # write.php 탈출하면 성공으로 가정
+            WebDriverWait(driver, 5).until(lambda d: "write.php" not in d.current_url)
+            return True
+        except Exception:
+            return False
+
     _hide(driver)
     # pick_time에서 NoAvailablePreferredTime이 발생하면 그대로 상위로 전달
     picked = pick_time(driver, preferred_times, timeout=timeout)
@@ -197,16 +508,15 @@ def try_select_time_and_submit(driver, preferred_times, form_data, timeout: int
 
 
 
-def fast_retry_loop(driver, office_no, target_date, preferred_times, form_data, retry_seconds: int = 60) -> bool:
-    """오픈 직후 경쟁 상황에서
-    retry_seconds 동안 0.3초 간격으로 재시도"""
-    end_t = time.time() + retry_seconds
-    while time.time() < end_t:
+def fast_retry_loop(driver, office_no, target_date, preferred_times, form_data, retry_seconds: int = 60,
+                    policy=None) -> bool:
+    """오픈 직후 경쟁 상황에서 재시도
+    policy 미지정 시 retry_seconds 동안 0.3초 간격 (retry_policy.FixedRetry)"""
+    def attempt():
         open_write_page(driver, office_no, target_date)
-        if try_select_time_and_submit(driver, preferred_times, form_data):
-            return True
-        time.sleep(0.3)  # 과도 트래픽 방지
-    return False
+        return try_select_time_and_submit(driver, preferred_times, form_data)
+
+    return run_retry_loop(attempt, policy or FixedRetry(retry_seconds))
 
 # 내부 전용: 팝업 숨김
 def _hide(driver):
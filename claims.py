@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import threading
+import datetime as dt
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from config import DATA_DIR
+
+
+# --------- 파일 잠금 (O_EXCL 잠금 파일: Windows/리눅스 공용) ---------
+
+@contextmanager
+def _file_lock(path: str, timeout: float = 5.0, stale: float = 10.0):
+    deadline = time.time() + timeout
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.write(fd, str(os.getpid()).encode())
+            os.close(fd)
+            break
+        except FileExistsError:
+            try:
+                # 잠근 채 죽은 프로세스가 남긴 잠금 파일은 치운다
+                if time.time() - os.path.getmtime(path) > stale:
+                    os.remove(path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.time() > deadline:
+                raise TimeoutError(f"슬롯 표 잠금 대기 시간 초과: {path}")
+            time.sleep(0.002)
+    try:
+        yield
+    finally:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# --------- 슬롯 점유 표 ---------
+
+CLAIMED, WON, GONE = "claimed", "won", "gone"
+
+
+class ClaimTable:
+    """
+    (면, 날짜, 시간) 슬롯을 어느 계정이 맡았는지 기록하는 공유 표. 같은 PC의 여러 스레드/프로세스(앱 여러 개)가
+    파일 하나를 잠금 파일로 번갈아 고쳐 쓴다.
+    - claimed: 그 계정만 시도 (ttl 초 동안 갱신이 없으면 다른 계정이 가져갈 수 있음)
+    - won: 예약 성공 → 누구도 다시 시도하지 않음
+    - gone: 마감 확인 → 누구도 다시 시도하지 않음
+    조회는 메모리 사본만 읽는다 (파일 왕복 없음). 사본은 고칠 때마다 디스크의 최신 표(다른 프로세스 변경 포함)로
+    바뀌므로 다른 프로세스의 변경은 이 표를 한 번 고친 뒤에 보인다.
+    파일 읽기/쓰기는 모두 잠금 안에서만 한다 (Windows 에서는 열려 있는 파일로 os.replace 하면 PermissionError).
+    """
+
+    def __init__(self, path: Optional[str] = None, *, ttl: float = 90.0):
+        self.path = path or os.path.join(DATA_DIR, "claims.json")
+        self.ttl = ttl
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()       # 같은 프로세스의 스레드끼리 (파일 잠금보다 먼저 잡음)
+        self._table: Dict[str, dict] = {}
+        self.reload()
+
+    @staticmethod
+    def key(office_no: int, date: dt.date, hour: str) -> str:
+        return f"{office_no}|{date.isoformat()}|{hour}"
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save(self, table: Dict[str, dict]):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(table, f)
+        os.replace(tmp, self.path)
+
+    @contextmanager
+    def _edit(self):
+        with self._lock, _file_lock(self.path + ".lock"):
+            table = self._load()
+            yield table
+            self._save(table)
+            self._table = table
+
+    def reload(self):
+        """디스크의 최신 표로 메모리 사본을 바꾼다"""
+        with self._lock, _file_lock(self.path + ".lock"):
+            self._table = self._load()
+
+    def _snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return self._table
+
+    def _free(self, entry: Optional[dict], account: str) -> bool:
+        if entry is None:
+            return True
+        if entry["state"] != CLAIMED:
+            return False
+        return entry["owner"] == account or time.time() - entry["t"] > self.ttl
+
+    # --- 조작 ---
+
+    def claim(self, account: str, office_no: int, date: dt.date, hour: str) -> bool:
+        """비어 있거나(만료 포함) 이미 내 것이면 점유/갱신하고 True"""
+        return self.claim_many([(account, (office_no, date, hour))])[0]
+
+    def claim_many(self, claims: List[Tuple[str, Tuple[int, dt.date, str]]]) -> List[bool]:
+        """[(계정, 슬롯)] 을 한 번의 파일 왕복으로 점유/갱신 → 슬롯별 성공 여부"""
+        out = []
+        with self._edit() as table:
+            now = time.time()
+            for account, slot in claims:
+                k = self.key(*slot)
+                ok = self._free(table.get(k), account)
+                if ok:
+                    table[k] = {"owner": account, "state": CLAIMED, "t": now}
+                out.append(ok)
+        return out
+
+    def claim_next(self, account: str, slots: List[Tuple[int, dt.date, str]]) -> Optional[Tuple[int, dt.date, str]]:
+        """slots(우선순위 순) 중 아무도 맡지 않은 첫 슬롯을 점유해 반환 (없으면 None)"""
+        with self._edit() as table:
+            for office_no, date, hour in slots:
+                k = self.key(office_no, date, hour)
+                entry = table.get(k)
+                if entry is None or (entry["state"] == CLAIMED and time.time() - entry["t"] > self.ttl):
+                    table[k] = {"owner": account, "state": CLAIMED, "t": time.time()}
+                    return office_no, date, hour
+        return None
+
+    def release(self, account: str, slots: List[Tuple[int, dt.date, str]]):
+        """slots 중 account 가 점유 중인 것을 놓아준다"""
+        with self._edit() as table:
+            for slot in slots:
+                k = self.key(*slot)
+                entry = table.get(k)
+                if entry and entry["state"] == CLAIMED and entry["owner"] == account:
+                    del table[k]
+
+    def mark_won(self, account: str, office_no: int, date: dt.date, hour: str):
+        with self._edit() as table:
+            table[self.key(office_no, date, hour)] = {"owner": account, "state": WON, "t": time.time()}
+
+    def mark_gone(self, office_no: int, date: dt.date, hours: List[str]):
+        with self._edit() as table:
+            for hour in hours:
+                k = self.key(office_no, date, hour)
+                if table.get(k, {}).get("state") != WON:
+                    table[k] = {"owner": None, "state": GONE, "t": time.time()}
+
+    # --- 조회 (메모리 사본) ---
+
+    def owned(self, account: str, slots: List[Tuple[int, dt.date, str]]) -> List[Tuple[int, dt.date, str]]:
+        """slots 중 지금 account 가 점유 중인 것 (우선순위 순서 유지)"""
+        table = self._snapshot()
+        mine = []
+        for s in slots:
+            entry = table.get(self.key(*s))
+            if entry and entry["state"] == CLAIMED and entry["owner"] == account:
+                mine.append(s)
+        return mine
+
+    def open_slots(self, slots: List[Tuple[int, dt.date, str]]) -> List[Tuple[int, dt.date, str]]:
+        """아직 성공/마감이 아닌 슬롯"""
+        table = self._snapshot()
+        return [s for s in slots if table.get(self.key(*s), {}).get("state") not in (WON, GONE)]
+
+    def wins(self, date: dt.date) -> List[Tuple[str, int, str]]:
+        """[(계정, 면, 시간)] — 해당 날짜에 성공한 슬롯 (디스크에서 다시 읽음)"""
+        self.reload()
+        out = []
+        for k, entry in self._snapshot().items():
+            office_no, day, hour = k.split("|")
+            if day == date.isoformat() and entry["state"] == WON:
+                out.append((entry["owner"], int(office_no), hour))
+        return out
+
+    def clear(self, date: Optional[dt.date] = None):
+        """date 의 기록(없으면 전체) 삭제 — 새 오픈 회차 시작 전"""
+        with self._edit() as table:
+            for k in [k for k in table if date is None or k.split("|")[1] == date.isoformat()]:
+                del table[k]
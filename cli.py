@@ -0,0 +1,132 @@
+"""
+Tk 없이 작업 파일로 예약 실행 (서버/cron 용)
+
+    python cli.py jobs.json --out results.json
+    python main.py jobs.yaml            # main.py 에 인자를 주면 CLI 로 동작
+
+작업 파일: 작업 목록(JSON/YAML). 비밀번호를 생략하면 keyring 에 저장된 값을 사용.
+    [{"user_id": "me", "date": "2025-06-01", "offices": [1, 2], "hours": ["06", "08"],
+      "phone": "010-0000-0000", "resident": "관내", "engine": "http",
+      "accounts": ["friend1", "friend2"]}]      # 함께 예약할 추가 계정 (accounts.py 로 저장)
+    대상마다 면/날짜/시간을 다르게 (나열 순서가 우선순위, 하나만 예약):
+    [{"user_id": "me", "phone": "010-0000-0000", "hours": ["19"],
+      "targets": [{"office": 1, "date": "2025-06-01"}, {"office": 2, "date": "2025-06-02", "hours": ["07"]}]}]
+"""
+import sys
+import json
+import asyncio
+import argparse
+import datetime as dt
+from typing import List
+
+import tracing
+from config import SERVICE_NAME
+from runner import BookingJob, JobResult, run_job
+
+
+def load_jobs(path: str) -> List[BookingJob]:
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml  # PyYAML 은 YAML 작업 파일을 쓸 때만 필요
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("jobs", [])
+
+    jobs = []
+    for d in data:
+        password = None
+        if not d.get("password"):
+            import keyring
+            if keyring.get_password(SERVICE_NAME, "user_id") == d["user_id"]:
+                password = keyring.get_password(SERVICE_NAME, "user_pw")
+            if not password:
+                # 로그인 실패는 오픈 시각이 지나서야 드러나므로 시작 전에 멈춘다
+                raise ValueError(f"{d['user_id']}: 비밀번호가 없습니다 (작업 파일의 password 또는 keyring 저장 필요)")
+        extra = []
+        for a in d.get("accounts", []):
+            # "아이디" 또는 {"user_id": ..., "password": ...}
+            uid, pw = (a["user_id"], a.get("password")) if isinstance(a, dict) else (a, None)
+            if not pw:
+                from accounts import get_password
+                pw = get_password(uid)
+            if not pw:
+                raise ValueError(f"{uid}: 비밀번호가 없습니다 (python accounts.py add {uid})")
+            extra.append((uid, pw))
+        jobs.append(BookingJob.from_dict(d, password=password, accounts=extra))
+    return jobs
+
+
+def _log(job: BookingJob):
+    def log(msg: str):
+        print(f"{dt.datetime.now():%H:%M:%S.%f}"[:-3] + f" [{job.name}] {msg}", flush=True)
+    return log
+
+
+async def schedule(jobs: List[BookingJob], prep_minutes: float = 10.0) -> List[JobResult]:
+    """작업마다 (오픈 시각 - prep_minutes) 에 깨워 각자 스레드에서 run_job 실행"""
+
+    async def one(job: BookingJob) -> JobResult:
+        wake = job.open_time() - dt.timedelta(minutes=prep_minutes)
+        delay = (wake - dt.datetime.now()).total_seconds()
+        if delay > 0:
+            _log(job)(f"{wake:%Y-%m-%d %H:%M:%S} 까지 대기")
+            await asyncio.sleep(delay)
+        return await asyncio.to_thread(run_job, job, _log(job), False)
+
+    return await asyncio.gather(*(one(job) for job in jobs))
+
+
+def record_history(results, trace) -> None:
+    import history
+    # 작업이 여럿이면 트레이스에 서로의 시도가 섞이므로 요약(발사/결과)만 남긴다
+    shared = trace if len(results) == 1 else None
+    for r in results:
+        try:
+            history.record_run(r, shared)
+        except Exception as e:
+            print(f"[{r.job.name}] 실행 기록 저장 실패: {e}", file=sys.stderr)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="테니스 예약 헤드리스 실행")
+    ap.add_argument("job_file", help="작업 파일 (.json / .yaml)")
+    ap.add_argument("--out", help="결과 JSON 파일 (기본: 표준출력)")
+    ap.add_argument("--prep-minutes", type=float, default=10.0, help="오픈 몇 분 전에 작업을 시작할지")
+    ap.add_argument("--trace", action="store_true", help="단계별 트레이스 JSONL 저장")
+    args = ap.parse_args(argv)
+
+    from keyring.errors import KeyringError
+    try:
+        jobs = load_jobs(args.job_file)
+    except ValueError as e:
+        print(f"작업 파일 오류: {e}", file=sys.stderr)
+        return 2
+    except KeyringError as e:
+        # 헤드리스 환경에는 keyring 백엔드가 없을 수 있다 (NoKeyringError)
+        print(f"keyring 을 읽을 수 없습니다: {e} (작업 파일에 password 를 넣으세요)", file=sys.stderr)
+        return 2
+    if not jobs:
+        print("작업이 없습니다.", file=sys.stderr)
+        return 2
+
+    # 트레이스는 실행 기록(history)의 시도별 지연에도 쓰이므로 항상 켠다 (--trace 는 JSONL 저장 여부)
+    tracing.start_run(job_file=args.job_file, jobs=[j.name for j in jobs])
+    results = asyncio.run(schedule(jobs, args.prep_minutes))
+    trace = tracing.end_run()
+    if args.trace:
+        print(f"트레이스 저장: {trace.export_jsonl()}", file=sys.stderr)
+    record_history(results, trace)
+
+    out = json.dumps([r.to_dict() for r in results], ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(out)
+    else:
+        print(out)
+    return 0 if all(r.success for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+import math
+import time
+import statistics
+from email.utils import parsedate_to_datetime
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from config import LOGIN_URL
+
+
+# --------- 서버 시계 동기화 ---------
+# Date 헤더는 초 단위라서 한 번의 샘플로는 ±0.5초 오차가 남는다.
+# 요청 간격을 1초의 배수가 아니게 흩뿌리면 초 경계를 가로지르는 샘플들이 생기고,
+# 각 샘플이 허용하는 offset 구간을 교집합하면 ±수십 ms 까지는 좁혀진다 (NTP 방식).
+# 그 다음은 초 경계를 이분 탐색: 구간 중간점 기준으로 서버 시각이 막 다음 초로 넘어가는 순간에
+# 도착하도록 한 번씩 보내면 응답 Date 에 따라 구간이 절반씩 줄어 RTT/2 수준까지 간다.
+
+class ClockSync:
+    """server_time = local_time + offset 관계와 측정 품질"""
+
+    def __init__(self, offset: float, rtt: float, jitter: float, error: float, samples: int):
+        self.offset = offset    # 초, 서버 - PC
+        self.rtt = rtt          # 초, 채택 샘플의 RTT 중앙값
+        self.jitter = jitter    # 초, 채택 샘플 RTT 표준편차
+        self.error = error      # 초, offset 추정 구간의 반폭
+        self.samples = samples  # 채택 샘플 수
+
+    @property
+    def lo(self) -> float:
+        """offset 구간의 아래 끝 — 이 값 기준으로 쏘면 실제 offset 이 구간 어디여도 오픈 전에 도착하지 않음"""
+        return self.offset - self.error
+
+    def __repr__(self):
+        return (f"ClockSync(offset={self.offset*1000:+.1f}ms, rtt={self.rtt*1000:.1f}ms, "
+                f"jitter={self.jitter*1000:.1f}ms, ±{self.error*1000:.1f}ms, n={self.samples})")
+
+
+def _host_root(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}/"
+
+
+def _sample(session: requests.Session, url: str) -> Optional[Tuple[float, float, float]]:
+    """HEAD 한 번 → (보낸 PC 시각, 받은 PC 시각, 서버 Date epoch), 실패하면 None"""
+    t0 = time.time()
+    p0 = time.perf_counter()
+    try:
+        resp = session.head(url, timeout=3, allow_redirects=False)
+    except requests.RequestException:
+        return None
+    p1 = time.perf_counter()
+    date = resp.headers.get("Date")
+    if not date:
+        return None
+    # 벽시계 대신 perf_counter 로 RTT를 재서 수신 시각을 보정
+    return t0, t0 + (p1 - p0), parsedate_to_datetime(date).timestamp()
+
+
+def sample_server_clock(session: requests.Session, url: str, count: int = 8,
+                        spacing: float = 0.137) -> List[Tuple[float, float, float]]:
+    """(보낸 PC 시각, 받은 PC 시각, 서버 Date epoch) 샘플 수집"""
+    samples = []
+    for _ in range(count):
+        s = _sample(session, url)
+        if s is not None:
+            samples.append(s)
+        time.sleep(spacing)
+    return samples
+
+
+def bisect_server_clock(session: requests.Session, url: str, samples: List[Tuple[float, float, float]],
+                        rounds: int = 10) -> List[Tuple[float, float, float]]:
+    """
+    현재 추정 offset 으로 '서버 시각 N.000 에 도착'하도록 보낸 샘플을 더해 가며 구간을 반씩 줄임.
+    구간 반폭이 RTT/2 아래로 내려가면 (더 좁힐 수 없으므로) 멈춘다. 한 번에 최대 1초 대기
+    """
+    for _ in range(rounds):
+        est = estimate_offset(samples)
+        if est is None or est.error <= est.rtt / 2 + 0.001:
+            break
+        arrive = est.rtt / 2
+        send_at = math.floor(time.time() + arrive + est.offset) + 1 - est.offset - arrive
+        if send_at - time.time() < 0.02:
+            send_at += 1
+        while True:
+            delta = send_at - time.time()
+            if delta <= 0:
+                break
+            time.sleep(delta if delta > 0.005 else 0)
+        s = _sample(session, url)
+        if s is not None:
+            samples.append(s)
+    return samples
+
+
+def estimate_offset(samples: List[Tuple[float, float, float]]) -> Optional[ClockSync]:
+    """
+    각 샘플은 offset ∈ [D - t1, D + 1 - t0] 를 허용한다.
+    RTT가 큰 샘플(중앙값의 1.5배 초과)은 버리고, 교집합이 비면 RTT가 큰 순으로 더 버린다.
+    """
+    if not samples:
+        return None
+    rtts = [t1 - t0 for t0, t1, _ in samples]
+    med = statistics.median(rtts)
+    kept = sorted((s for s in samples if (s[1] - s[0]) <= med * 1.5 + 0.002), key=lambda s: s[1] - s[0])
+
+    while kept:
+        lo = max(d - t1 for t0, t1, d in kept)
+        hi = min(d + 1 - t0 for t0, t1, d in kept)
+        if lo <= hi:
+            kept_rtts = [t1 - t0 for t0, t1, _ in kept]
+            return ClockSync(
+                offset=(lo + hi) / 2,
+                rtt=statistics.median(kept_rtts),
+                jitter=statistics.pstdev(kept_rtts),
+                error=(hi - lo) / 2,
+                samples=len(kept),
+            )
+        kept.pop()
+
+    # 모든 조합이 모순이면 중간점 기준 중앙값으로 대체
+    mids = [d + 0.5 - (t0 + t1) / 2 for t0, t1, d in samples]
+    return ClockSync(statistics.median(mids), med, statistics.pstdev(rtts), 0.5, len(samples))
+
+
+def sync_server_clock(session: Optional[requests.Session] = None, url: str = LOGIN_URL,
+                      count: int = 8, rounds: int = 10) -> Optional[ClockSync]:
+    """예약 서버 호스트에 HEAD 요청을 반복해 시계 차이를 추정 (대략 count×0.14 + rounds 초 이내)"""
+    own = session is None
+    session = session or requests.Session()
+    root = _host_root(url)
+    try:
+        return estimate_offset(bisect_server_clock(session, root, sample_server_clock(session, root, count=count),
+                                                   rounds=rounds))
+    finally:
+        if own:
+            session.close()
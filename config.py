@@ -1,4 +1,14 @@
-LOGIN_URL = "https://gmsc9400.mycafe24.com/bbs/board.php?bo_table=booking&office_no=1"
-WRITE_URL_TMPL = "https://gmsc9400.mycafe24.com/bbs/write.php?bo_table=booking&office_no={office_no}&select={date}"  # date=YYYY-MM-DD
+import os
 
-SERVICE_NAME = "GMSC_TENNIS"  # keyring service name
\ No newline at end of file
+# 로컬 테스트 서버(mock_server.py)로 돌릴 때는 TENNIS_BASE_URL=http://127.0.0.1:8800 지정
+BASE_URL = os.environ.get("TENNIS_BASE_URL", "https://gmsc9400.mycafe24.com").rstrip("/")
+
+LOGIN_URL = BASE_URL + "/bbs/board.php?bo_table=booking&office_no=1"
+WRITE_URL_TMPL = BASE_URL + "/bbs/write.php?bo_table=booking&office_no={office_no}&select={date}"  # date=YYYY-MM-DD
+
+OFFICE_NOS = (1, 2, 3)  # 테니스장 면 번호
+
+SERVICE_NAME = "GMSC_TENNIS"  # keyring service name
+
+# 실행 기록(트레이스 등) 저장 위치
+DATA_DIR = os.path.join(os.path.expanduser("~"), ".tennis-macro")
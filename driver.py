@@ -1,7 +1,35 @@
 from selenium.webdriver import Chrome
 from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.support.ui import WebDriverWait
 
-def build_driver(headless: bool = False):
+from tracing import traced
+
+# race 프로필에서 막을 리소스 (이미지/폰트/스타일시트 + 예약과 무관한 외부 호스트)
+BLOCKED_URL_PATTERNS = [
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*",
+    "*.woff*", "*.ttf*", "*.otf*", "*.eot*",
+    "*.css*",
+    "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*", "*facebook.net*",
+    "*kakao.com*", "*daumcdn.net*", "*naver.net*",
+]
+
+# 문서 시작 시점에 주입하는 팝업 숨김 스타일 (로드 후 hide_popups 호출 불필요)
+_POPUP_STYLE_JS = """
+(function add() {
+    const root = document.head || document.documentElement;
+    if (!root) { document.addEventListener('readystatechange', add, {once: true}); return; }
+    const st = document.createElement('style');
+    st.textContent = '#popup, .pop { display: none !important; }';
+    root.appendChild(st);
+})();
+"""
+
+@traced("build_driver")
+def build_driver(headless: bool = False, profile: str = "default"):
+    """
+    profile="race": pageLoadStrategy=eager + CDP로 불필요한 리소스 차단 + 팝업 스타일 선주입
+    """
     opts = ChromeOptions()
     if headless:
         opts.add_argument("--headless=new")
@@ -9,15 +37,54 @@ def build_driver(headless: bool = False):
     opts.add_argument("--disable-blink-features=AutomationControlled")
     opts.add_argument("--no-sandbox")
     opts.add_argument("--disable-dev-shm-usage")
+    if profile == "race":
+        opts.page_load_strategy = "eager"
+        opts.add_argument("--blink-settings=imagesEnabled=false")
     driver = Chrome(options=opts)
-    driver.set_page_load_timeout(60)
+    apply_profile(driver, profile)
     return driver
 
+
+@traced("attach_driver")
+def attach_driver(debugger_address: str, profile: str = "default"):
+    """
+    이미 떠 있는 Chrome(debuggerAddress)에 chromedriver 세션만 새로 붙임 (Chrome 프로세스는 새로 안 띄움).
+    CDP 설정은 붙은 뒤 현재 탭 기준이므로 탭을 바꾼 뒤 apply_profile 을 다시 호출할 것
+    """
+    opts = ChromeOptions()
+    opts.debugger_address = debugger_address
+    if profile == "race":
+        opts.page_load_strategy = "eager"
+    driver = Chrome(options=opts)
+    driver.race_profile = profile == "race"
+    return driver
+
+
+def apply_profile(driver, profile: str):
+    """페이지 로드 제한 + (race) 리소스 차단/팝업 스타일 — CDP 설정은 현재 탭에 적용됨"""
+    driver.set_page_load_timeout(60)
+    driver.race_profile = profile == "race"
+    if driver.race_profile:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _POPUP_STYLE_JS})
+
 def hide_popups(driver):
     """페이지 공통 팝업 숨김 (#popup 등)"""
+    if getattr(driver, "race_profile", False):
+        return  # 스타일이 이미 문서 시작 시 주입됨
     try:
         driver.execute_script("""
             document.querySelectorAll('#popup, .pop').forEach(el => el.style.display='none');
         """)
     except Exception:
         pass
+
+def wait_write_ready(driver, timeout: float = 20):
+    """
+    작성 페이지 준비 판정: #fwrite 만 확인 (이미지/CSS 로드는 기다리지 않음)
+    #booking_time 은 오픈 전에는 없을 수 있으므로 여기서 요구하지 않고 슬롯을 읽는 쪽에서 확인
+    """
+    WebDriverWait(driver, timeout, poll_frequency=0.02).until(
+        lambda d: d.execute_script("return !!document.getElementById('fwrite');")
+    )
@@ -1,19 +1,33 @@
+import os
+import time
+import queue
 import threading
 import datetime as dt
-import keyring
 import tkinter as tk
 from tkinter import ttk, messagebox
 
-from config import SERVICE_NAME
-from driver import build_driver
-from booking import login, open_write_page, try_select_time_and_submit, fast_retry_loop, compute_open_time, wait_until
-from utils import NoAvailablePreferredTime
+from config import SERVICE_NAME, OFFICE_NOS
+import tracing
+import slot_layout
+
+# selenium / bs4 / requests / keyring 은 창이 뜬 뒤 필요한 시점에 import 한다 (실행 파일 시작 속도)
+
+ENGINE_BROWSER = "브라우저(Selenium)"
+ENGINE_HTTP = "HTTP(브라우저 없음)"
+RACE_RELOAD = "페이지 새로고침"
+RACE_INPAGE = "페이지 내 폴링"
+RETRY_FIXED = "고정 0.3초"
+RETRY_ADAPTIVE = "적응형"
+
+LOG_MAX_LINES = 2000     # 로그 창에 남길 최대 줄 수 (오래된 줄부터 삭제)
+DRAIN_INTERVAL_MS = 50   # 이벤트 큐를 비우는 주기
+DRAIN_BATCH = 500        # 한 번에 그릴 최대 이벤트 수
 
 class TennisGUI(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("테니스 예약 매크로")
-        self.geometry("700x550")
+        self.geometry("700x650")
 
         frm = ttk.Frame(self, padding=10)
         frm.pack(fill="both", expand=True)
@@ -49,9 +63,14 @@ class TennisGUI(tk.Tk):
         self.cb_month.bind("<<ComboboxSelected>>", lambda e: self.on_date_change())
 
         # 면 선택
-        ttk.Label(frm, text="테니스장 면(1/2/3)").grid(row=4, column=0, sticky="w", pady=4)
+        ttk.Label(frm, text="테니스장 면(1/2/3, 콤마로 복수)").grid(row=4, column=0, sticky="w", pady=4)
         self.entry_office = ttk.Entry(frm, width=10); self.entry_office.insert(0, "1")
         self.entry_office.grid(row=4, column=1, sticky="w", pady=4)
+        self.entry_office.bind("<FocusOut>", lambda e: self.on_office_change())
+        # 다른 날짜/시간 대상 추가 (면:날짜[:시간,시간]; ... → 예약일 × 면 다음 순위로 함께 시도)
+        target_row = ttk.Frame(frm); target_row.grid(row=4, column=1, sticky="e", pady=4)
+        ttk.Label(target_row, text="추가 대상(면:MM-DD[:시간];…)").grid(row=0, column=0, padx=(0,4))
+        self.entry_targets = ttk.Entry(target_row, width=22); self.entry_targets.grid(row=0, column=1)
 
         # 시간 선택 (will be built dynamically based on season)
         ttk.Label(frm, text="선호 시간(복수 체크)").grid(row=5, column=0, sticky="nw", pady=4)
@@ -65,6 +84,10 @@ class TennisGUI(tk.Tk):
         self.resident = ttk.Combobox(frm, values=["관내", "관외"], state="readonly", width=10)
         self.resident.current(0); self.resident.grid(row=6, column=1, sticky="w", pady=4)
 
+        # 추가 계정 (비밀번호는 keyring: python accounts.py add 아이디)
+        ttk.Label(frm, text="추가 계정(아이디 콤마)").grid(row=7, column=0, sticky="w", pady=4)
+        self.entry_accounts = ttk.Entry(frm, width=40); self.entry_accounts.grid(row=7, column=1, sticky="w", pady=4)
+
         # 연락처
         ttk.Label(frm, text="연락처").grid(row=8, column=0, sticky="w", pady=4)
         self.entry_phone = ttk.Entry(frm, width=20); self.entry_phone.grid(row=8, column=1, sticky="w", pady=4)
@@ -77,16 +100,77 @@ class TennisGUI(tk.Tk):
         ttk.Label(frm, text="동반자명(콤마로 구분)").grid(row=10, column=0, sticky="w", pady=4)
         self.entry_comp_names = ttk.Entry(frm, width=40); self.entry_comp_names.grid(row=10, column=1, sticky="w", pady=4)
 
+        # 엔진
+        ttk.Label(frm, text="예약 엔진").grid(row=11, column=0, sticky="w", pady=4)
+        self.engine = ttk.Combobox(frm, values=[ENGINE_BROWSER, ENGINE_HTTP], state="readonly", width=24)
+        self.engine.current(0); self.engine.grid(row=11, column=1, sticky="w", pady=4)
+        self.engine.bind("<<ComboboxSelected>>", lambda e: self.on_engine_change())
+        self.race_profile = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frm, text="빠른 브라우저(이미지/CSS 차단)", variable=self.race_profile).grid(row=11, column=1, sticky="e", pady=4)
+
+        # 발사 보정 (서버 00:00:00 - RTT/2 에서 추가로 앞당길 ms)
+        ttk.Label(frm, text="발사 보정(ms)").grid(row=12, column=0, sticky="w", pady=4)
+        self.entry_fire_adj = ttk.Entry(frm, width=10); self.entry_fire_adj.insert(0, "0")
+        self.entry_fire_adj.grid(row=12, column=1, sticky="w", pady=4)
+
+        # 중복 제출: 한 면에 같은 제출을 여러 세션으로 어긋나게 보냄 (1 = 끔, 여러 면 선택 시 무시)
+        hedge_row = ttk.Frame(frm); hedge_row.grid(row=12, column=1, sticky="e", pady=4)
+        ttk.Label(hedge_row, text="중복 제출 세션").grid(row=0, column=0, padx=(0,4))
+        self.entry_hedge = ttk.Entry(hedge_row, width=4); self.entry_hedge.insert(0, "1")
+        self.entry_hedge.grid(row=0, column=1, padx=(0,10))
+        ttk.Label(hedge_row, text="간격(ms)").grid(row=0, column=2, padx=(0,4))
+        self.entry_hedge_stagger = ttk.Entry(hedge_row, width=6); self.entry_hedge_stagger.insert(0, "30")
+        self.entry_hedge_stagger.grid(row=0, column=3, padx=(0,10))
+        self.shared_browser = tk.BooleanVar(value=False)
+        ttk.Checkbutton(hedge_row, text="Chrome 하나 공유", variable=self.shared_browser).grid(row=0, column=4)
+
+        # 경쟁 방식 (브라우저 엔진 전용: 페이지 내 폴링)
+        ttk.Label(frm, text="경쟁 방식").grid(row=13, column=0, sticky="w", pady=4)
+        race_row = ttk.Frame(frm); race_row.grid(row=13, column=1, sticky="w", pady=4)
+        self.race_mode = ttk.Combobox(race_row, values=[RACE_RELOAD, RACE_INPAGE], state="readonly", width=18)
+        self.race_mode.current(0); self.race_mode.grid(row=0, column=0, padx=(0,6))
+        ttk.Label(race_row, text="폴링 간격(ms)").grid(row=0, column=1, padx=(0,4))
+        self.entry_poll_ms = ttk.Entry(race_row, width=6); self.entry_poll_ms.insert(0, "100")
+        self.entry_poll_ms.grid(row=0, column=2, padx=(0,10))
+        ttk.Label(race_row, text="재시도").grid(row=0, column=3, padx=(0,4))
+        self.retry_mode = ttk.Combobox(race_row, values=[RETRY_FIXED, RETRY_ADAPTIVE], state="readonly", width=10)
+        self.retry_mode.current(0); self.retry_mode.grid(row=0, column=4, padx=(0,10))
+        self.retry_mode.bind("<<ComboboxSelected>>", lambda e: self.apply_tuning())
+        ttk.Label(race_row, text="버스트(ms)").grid(row=0, column=5, padx=(0,4))
+        self.entry_burst_ms = ttk.Entry(race_row, width=5); self.entry_burst_ms.insert(0, "20")
+        self.entry_burst_ms.grid(row=0, column=6)
+        # apply_tuning 이 마지막으로 채운 값 (사용자가 고친 칸은 덮어쓰지 않음)
+        self.auto_filled = {self.entry_fire_adj: "0", self.entry_burst_ms: "20"}
+
         # 로그
-        ttk.Label(frm, text="로그").grid(row=13, column=0, sticky="nw", pady=4)
-        self.log = tk.Text(frm, height=12, width=62); self.log.grid(row=13, column=1, sticky="w", pady=4)
+        ttk.Label(frm, text="로그").grid(row=14, column=0, sticky="nw", pady=4)
+        self.log = tk.Text(frm, height=12, width=62); self.log.grid(row=14, column=1, sticky="w", pady=4)
 
         # 버튼
-        btn_box = ttk.Frame(frm); btn_box.grid(row=14, column=1, sticky="e", pady=8)
-        ttk.Button(btn_box, text="예약 실행", command=self.run_thread).grid(row=0, column=1, padx=5, pady=4)
-
-        # 첫 실행 시 저장된 계정 로드
-        self.load_creds(silent=True)
+        btn_box = ttk.Frame(frm); btn_box.grid(row=15, column=1, sticky="e", pady=8)
+        ttk.Label(btn_box, text="감시 일수").grid(row=0, column=0, padx=(0,4))
+        self.entry_watch_days = ttk.Entry(btn_box, width=4); self.entry_watch_days.insert(0, "7")
+        self.entry_watch_days.grid(row=0, column=1, padx=(0,4))
+        self.btn_watch = ttk.Button(btn_box, text="취소표 감시", command=self.toggle_monitor)
+        self.btn_watch.grid(row=0, column=2, padx=5, pady=4)
+        ttk.Button(btn_box, text="예약 실행", command=self.run_thread).grid(row=0, column=3, padx=5, pady=4)
+        self.watcher = None
+
+        # 예약 스레드 → Tk 메인 루프 이벤트 큐 (로그/대화상자)
+        self.events = queue.SimpleQueue()
+        self.after(DRAIN_INTERVAL_MS, self.drain_events)
+
+        # 창이 먼저 뜨도록 계정 로드와 브라우저 선실행은 메인 루프 시작 후로 미룸
+        self.prelaunched = None          # (profile, driver) — 입력하는 동안 미리 띄워 둔 Chrome
+        self.prelaunch_thread = None     # 띄우는 중인 스레드 (take_prelaunched 가 끝날 때까지 기다림)
+        self.prelaunch_lock = threading.Lock()
+        self.after(50, lambda: self.load_creds(silent=True))
+        self.after(300, self.prelaunch_driver)
+        self.after(500, self.apply_tuning)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.startup_probe = os.environ.get("TENNIS_STARTUP_PROBE")  # bench.py startup 용 기록 파일
+        if self.startup_probe:
+            self.after_idle(lambda: self.probe("window"))
 
     # ---- date/time helpers ----
 
@@ -111,15 +195,69 @@ class TennisGUI(tk.Tk):
             self.cb_day.set(day_values[0])
         # also rebuild time slots because season may change when month changes
         self.rebuild_time_slots()
+        self.apply_tuning()
+
+    def on_office_change(self):
+        # 면마다 저장된 슬롯 배치/실행 기록이 다를 수 있음
+        self.rebuild_time_slots()
+        self.apply_tuning()
+
+    def apply_tuning(self):
+        """
+        지난 회차 기록(history.sqlite3)으로 발사 보정/버스트 간격을 미리 채움 (같은 면 + 오픈 요일)
+        여러 면을 고른 경우는 면별 기록이 없으므로 건너뛰고, 사용자가 직접 고친 칸은 그대로 둔다
+        """
+        try:
+            office_nos = [int(x) for x in self.entry_office.get().split(",") if x.strip()]
+            date_obj = self.selected_date()
+        except ValueError:
+            return
+        if len(office_nos) != 1:
+            return
+        office_no = office_nos[0]
+        adaptive = self.retry_mode.get() == RETRY_ADAPTIVE
+
+        def work():
+            try:
+                from booking import compute_open_time
+                import history
+                t = history.tune(office_no, compute_open_time(date_obj).weekday(), retries_past_full=adaptive)
+            except Exception as e:
+                self.log_print(f"[경고] 실행 기록 조회 실패: {e}")
+                return
+            if t is None:
+                return
+
+            def fill():
+                kept = False
+                for entry, value in ((self.entry_fire_adj, t["fire_adj_ms"]), (self.entry_burst_ms, t["burst_interval_ms"])):
+                    if entry.get().strip() != self.auto_filled[entry]:
+                        kept = True
+                        continue
+                    entry.delete(0, "end"); entry.insert(0, str(value))
+                    self.auto_filled[entry] = str(value)
+                peak = f", 오픈 직후 응답 p50 {t['peak_latency_ms']:.0f}ms" if t["peak_latency_ms"] is not None else ""
+                note = " (직접 입력한 값은 유지)" if kept else ""
+                self.log_print(f"[자동 보정] {office_no}면 최근 {t['runs']}회: 오픈 {t['open_delay_ms']:+.0f}ms 추정{peak} "
+                               f"→ 발사 보정 {t['fire_adj_ms']}ms, 버스트 {t['burst_interval_ms']}ms{note}")
+            self.events.put(("call", fill))
+        threading.Thread(target=work, daemon=True).start()
 
     def selected_date(self) -> dt.date:
         return dt.date(int(self.cb_year.get()), int(self.cb_month.get()), int(self.cb_day.get()))
 
     def is_winter(self, date_obj: dt.date) -> bool:
         # winter: November(11), December(12), January(1), February(2)
-        return date_obj.month in (11, 12, 1, 2)
+        return slot_layout.season_of(date_obj) == "winter"
 
     def build_time_hours_for_date(self, date_obj: dt.date):
+        # 지난 실행이 작성 페이지에서 읽어 둔 슬롯 배치가 있으면 그 시간표를 그대로 쓴다 (시즌 규칙보다 우선)
+        try:
+            layout = slot_layout.load(int(self.entry_office.get().split(",")[0]), date_obj)
+        except ValueError:
+            layout = None
+        if layout:
+            return layout.hours()
         # return list of hour strings with 2-hour steps depending on season
         if self.is_winter(date_obj):
             start, end = 7, 19
@@ -138,20 +276,136 @@ class TennisGUI(tk.Tk):
         except Exception:
             date_obj = dt.date.today()
         hours = self.build_time_hours_for_date(date_obj)
+        checked = {hh for hh, var in self.time_vars.items() if var.get()}
         self.time_vars = {}
         for ix, hh in enumerate(hours):
-            var = tk.BooleanVar(value=False)
+            var = tk.BooleanVar(value=hh in checked)
             self.time_vars[hh] = var
             ttk.Checkbutton(self.time_box, text=f"{hh}시", variable=var).grid(row=ix//4, column=ix%4, sticky="w", padx=4, pady=2)
     
     # ---- helpers ----
 
     def log_print(self, msg: str):
-        self.log.insert("end", f"{dt.datetime.now().strftime('%H:%M:%S')}  {msg}\n")
-        self.log.see("end")
-        self.update_idletasks()
+        """어느 스레드에서든 호출 가능: 큐에 넣기만 하고 바로 돌아온다"""
+        self.events.put(("log", f"{dt.datetime.now().strftime('%H:%M:%S.%f')[:-3]}  {msg}\n"))
+
+    def notify(self, kind: str, title: str, msg: str):
+        """messagebox 를 메인 스레드에서 띄우도록 요청 (kind: info | warning | error)"""
+        self.events.put(("dialog", (kind, title, msg)))
+
+    def drain_events(self):
+        """메인 루프에서 주기적으로 큐를 비워 로그는 한 번에 그리고, 대화상자는 여기서 띄운다"""
+        lines, dialogs, calls = [], [], []
+        try:
+            for _ in range(DRAIN_BATCH):
+                kind, payload = self.events.get_nowait()
+                {"log": lines, "dialog": dialogs, "call": calls}[kind].append(payload)
+        except queue.Empty:
+            pass
+        for fn in calls:
+            fn()
+
+        if lines:
+            self.log.insert("end", "".join(lines))
+            overflow = int(self.log.index("end-1c").split(".")[0]) - 1 - LOG_MAX_LINES
+            if overflow > 0:
+                self.log.delete("1.0", f"{overflow + 1}.0")
+            self.log.see("end")
+
+        # 대화상자는 모달이라 다음 주기를 먼저 예약해 둔다 (떠 있는 동안에도 로그는 계속 그려짐)
+        self.after(DRAIN_INTERVAL_MS, self.drain_events)
+        for kind, title, msg in dialogs:
+            {"info": messagebox.showinfo, "warning": messagebox.showwarning,
+             "error": messagebox.showerror}[kind](title, msg)
+
+    def probe(self, stage: str):
+        """시작 시간 측정: 단계별 시각을 기록 파일에 남김 (driver 까지 준비되면 종료)"""
+        with open(self.startup_probe, "a", encoding="utf-8") as f:
+            f.write(f"{stage} {time.time()}\n")
+        if stage.startswith("driver"):
+            self.events.put(("call", self.on_close))
+
+    def on_close(self):
+        # 쓰지 않은 선실행 브라우저는 창과 함께 닫는다 (예약에 넘긴 브라우저는 그대로 둠)
+        # 아직 띄우는 중이면 끝날 때까지 기다렸다가 닫아야 Chrome 이 남지 않는다
+        drv = self.take_prelaunched(None)
+        if drv is not None:
+            drv.quit()
+        self.destroy()
+
+    def current_profile(self) -> str:
+        return "race" if self.race_profile.get() else "default"
+
+    def on_engine_change(self):
+        # HTTP 로 바꾸면 미리 띄운 Chrome 은 쓸 일이 없으므로 닫고, 브라우저로 돌아오면 다시 띄움
+        if self.engine.get() == ENGINE_HTTP:
+            self.discard_prelaunched()
+        else:
+            self.prelaunch_driver()
+
+    def prelaunch_driver(self):
+        """사용자가 입력하는 동안 백그라운드에서 Chrome/chromedriver 를 미리 띄움"""
+        if self.engine.get() == ENGINE_HTTP:
+            if self.startup_probe:
+                self.probe("driver_skipped")
+            return
+        if self.prelaunch_thread is not None and self.prelaunch_thread.is_alive():
+            return
+        with self.prelaunch_lock:
+            if self.prelaunched is not None:
+                return
+        profile = self.current_profile()
+
+        def work():
+            try:
+                from driver import build_driver
+                drv = build_driver(headless=False, profile=profile)
+            except Exception as e:
+                self.log_print(f"[안내] 브라우저 미리 실행 실패 (예약 시작 시 다시 시도): {e}")
+                if self.startup_probe:
+                    self.probe("driver_failed")
+                return
+            with self.prelaunch_lock:
+                self.prelaunched = (profile, drv)
+            if self.startup_probe:
+                self.probe("driver")
+
+        self.prelaunch_thread = threading.Thread(target=work, daemon=True)
+        self.prelaunch_thread.start()
+
+    def discard_prelaunched(self):
+        """미리 띄운(또는 띄우는 중인) 브라우저를 백그라운드에서 닫음"""
+        def work():
+            drv = self.take_prelaunched(None)
+            if drv is not None:
+                try:
+                    drv.quit()
+                except Exception:
+                    pass
+        threading.Thread(target=work, daemon=True).start()
+
+    def take_prelaunched(self, profile: str):
+        """
+        미리 띄운 브라우저를 넘겨받음 (프로필이 다르면 닫고 None, profile=None 이면 그대로 반환)
+        아직 띄우는 중이면 끝날 때까지 기다린다 — 그 사이 새 Chrome 을 또 띄우면 선실행한 쪽이 남음
+        """
+        pending = self.prelaunch_thread
+        if pending is not None and pending is not threading.current_thread():
+            pending.join()
+        with self.prelaunch_lock:
+            pre, self.prelaunched = self.prelaunched, None
+        if pre is None:
+            return None
+        if profile is not None and pre[0] != profile:
+            try:
+                pre[1].quit()
+            except Exception:
+                pass
+            return None
+        return pre[1]
 
     def load_creds(self, silent: bool = False):
+        import keyring
         try:
             saved_id = keyring.get_password(SERVICE_NAME, "user_id")
             saved_pw = keyring.get_password(SERVICE_NAME, "user_pw")
@@ -166,100 +420,227 @@ class TennisGUI(tk.Tk):
                 messagebox.showwarning("경고", f"자격증명 불러오기 실패: {e}")
 
     def save_creds(self, uid: str, pw: str):
+        import keyring
         try:
             keyring.set_password(SERVICE_NAME, "user_id", uid)
             keyring.set_password(SERVICE_NAME, "user_pw", pw)
         except Exception as e:
             self.log_print(f"[경고] 자격증명 저장 실패: {e}")
 
-    def run_thread(self):
-        threading.Thread(target=self.run, daemon=True).start()
+    def report_result(self, success: bool, use_http: bool):
+        if success:
+            self.log_print("✅ 예약 성공(추정). 완료 페이지를 확인해 주세요.")
+            where = "예약 내역" if use_http else "브라우저 화면"
+            self.notify("info", "성공", f"예약 성공(추정) — {where}을 확인해 주세요.")
+        else:
+            self.log_print("❌ 예약 실패 — 선호 시간이 모두 매진이거나 제출이 거부되었습니다.")
+            self.notify("warning", "실패", "예약에 실패했습니다. 선호 시간을 조정하거나 재시도해 보세요.")
 
-    def run(self):
+    def log_trace_summary(self, run):
+        if not run.records:
+            return
+        self.log_print("── 단계별 소요 시간 (ms) ──")
+        for name, st in run.summary().items():
+            self.log_print(f"{name:<28} n={st['n']:<3} p50={st['p50']:8.1f}  max={st['max']:8.1f}")
+        for rec in run.records:
+            if rec["type"] == "event" and rec["name"] == "wait_until":
+                self.log_print(f"발사 오차 {rec['error_ms']:+.2f}ms")
+        try:
+            self.log_print(f"트레이스 저장: {run.export_jsonl()}")
+        except OSError as e:
+            self.log_print(f"[경고] 트레이스 저장 실패: {e}")
+
+    def toggle_monitor(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.log_print("취소표 감시 중지 요청")
+            return
+        import http_booking
+        from monitor import CancellationWatcher
+        # 폼 값은 메인 스레드에서 읽고, watcher 도 스레드 시작 전에 잡아 둬서 버튼을 연달아 눌러도 감시가 하나만 돈다
         try:
             user_id = self.entry_id.get().strip()
             password = self.entry_pw.get().strip()
-            if not user_id:
-                messagebox.showerror("오류", "아이디를 입력하세요.")
-                return
-            if not password:
-                messagebox.showerror("오류", "비밀번호를 입력하세요.")
-                return
-            if self.save_cred.get():
-                self.save_creds(user_id, password)
-
-            # 날짜
-            try:
-                target_date = self.selected_date()
-            except Exception:
-                messagebox.showerror("오류", "예약일을 선택하세요.")
-                return
-
-            office_no = int(self.entry_office.get().strip())
             preferred_times = [k for k, v in self.time_vars.items() if v.get()]
-
+            if not (user_id and password and preferred_times and self.entry_phone.get().strip()):
+                messagebox.showerror("오류", "아이디/비밀번호/선호 시간/연락처를 입력하세요.")
+                return
+            start = self.selected_date()
+            days = int(self.entry_watch_days.get().strip() or "7")
             form_data = {
                 "resident": self.resident.get(),
                 "phone": self.entry_phone.get().strip(),
                 "companion_count": int(self.entry_comp_cnt.get().strip() or "0"),
                 "companions": [s.strip() for s in self.entry_comp_names.get().split(",") if s.strip()]
             }
+        except ValueError as e:
+            messagebox.showerror("오류", str(e))
+            return
+        dates = [start + dt.timedelta(days=i) for i in range(days)]
+        watcher = CancellationWatcher(http_booking.HttpClient(), dates, list(OFFICE_NOS), preferred_times,
+                                      credentials=(user_id, password), log=self.log_print)
+        self.watcher = watcher
+        self.btn_watch.configure(text="감시 중지")
+        threading.Thread(
+            target=self.run_monitor,
+            args=(watcher, user_id, password, form_data, self.engine.get() == ENGINE_HTTP, self.current_profile()),
+            daemon=True,
+        ).start()
+
+    def monitor_done(self, watcher):
+        """메인 스레드에서 호출 (events 큐 경유)"""
+        if self.watcher is watcher:
+            self.watcher = None
+            self.btn_watch.configure(text="취소표 감시")
+
+    def run_monitor(self, watcher, user_id: str, password: str, form_data: dict, use_http: bool, profile: str):
+        """선택한 예약일부터 N일 × 전체 면의 취소표를 감시하다가 선호 시간이 풀리면 바로 예약"""
+        import booking
+        import http_booking
+        from monitor import submit_on_free
+        try:
+            scanner = watcher.scanner
+            if not http_booking.login(scanner, user_id, password):
+                self.log_print("[경고] 감시용 세션 로그인 확인 실패")
+            if use_http:
+                engine, booker = http_booking, http_booking.clone_session(scanner)
+            else:
+                engine = booking
+                booker = self.take_prelaunched(profile)
+                if booker is None:
+                    from driver import build_driver
+                    booker = build_driver(headless=False, profile=profile)
+                booking.login(booker, user_id, password)
+
+            watcher.on_free = submit_on_free(engine, booker, form_data, log=self.log_print,
+                                             credentials=(user_id, password))
+            won = watcher.run()
+            if won:
+                self.log_print(f"취소표 예약 성공: {won[0]} 면{won[1]}")
+                self.report_result(True, use_http)
+            else:
+                self.log_print("취소표 감시 종료")
+        except Exception as e:
+            self.log_print(f"[예외] {e}")
+            self.notify("error", "오류", str(e))
+        finally:
+            self.events.put(("call", lambda: self.monitor_done(watcher)))
 
-            # 입력값 검증
-            if not preferred_times:
-                messagebox.showerror("오류", "선호 시간을 하나 이상 선택하세요.")
-                return
-            if not form_data["phone"]:
-                messagebox.showerror("오류", "연락처를 입력하세요.")
-                return
-
-            self.log_print(f"예약 준비: {target_date} (면 {office_no}), 선호시간 {preferred_times}")
-            open_dt = compute_open_time(target_date)
-            self.log_print(f"예약 오픈 예상 시각: {open_dt} (현재 {dt.datetime.now()})")
-
-            driver = build_driver(headless=False)
-            self.log_print("브라우저 준비 완료")
-
-            # 미리 로그인
-            self.log_print("로그인 시도 중...")
-            login(driver, user_id, password)
-            self.log_print("로그인 완료")
-
-            # 오픈 시각까지 대기
-            now = dt.datetime.now()
-            if now < open_dt:
-                self.log_print("오픈 시각까지 대기합니다...")
-                wait_until(open_dt)
-                self.log_print("오픈 시각 도달!")
-
-            # 1차 시도
-            self.log_print("작성 페이지 진입...")
-            open_write_page(driver, office_no, target_date)
-            try:
-                success = try_select_time_and_submit(driver, preferred_times, form_data) # preferred times=['07','09',...]
-            except NoAvailablePreferredTime as e:
-                self.log_print(f"❌ 예약 실패 — {str(e)}")
-                messagebox.showwarning("실패", f"{str(e)}")
-                return
-
-            # 빠른 재시도는 '일반 실패'일 때만 수행
-            if not success:
-                self.log_print("1차 실패 → 빠른 재시도 시작")
-                try:
-                    success = fast_retry_loop(driver, office_no, target_date, preferred_times, form_data)
-                except NoAvailablePreferredTime as e:
-                    # 재시도 중에도 전부 disabled인 상태가 확인되면 즉시 중단
-                    self.log_print(f"❌ 예약 실패 — {str(e)}")
-                    messagebox.showwarning("실패", f"{str(e)}")
-                    return
-    
-            if success:
-                self.log_print("✅ 예약 성공(추정). 완료 페이지를 확인해 주세요.")
-                messagebox.showinfo("성공", "예약 성공(추정) — 브라우저 화면을 확인해 주세요.")
+    def run_thread(self):
+        # Tk 위젯은 메인 스레드에서만 읽는다 — 폼 값을 BookingJob 으로 묶어 작업 스레드에 넘김
+        try:
+            job = self.read_job()
+        except ValueError as e:
+            messagebox.showerror("오류", f"입력값 오류: {e}")
+            return
+        if job is None:
+            return
+        threading.Thread(target=self.run, args=(job, self.current_profile()), daemon=True).start()
+
+    def read_job(self):
+        """폼 → BookingJob (입력 오류면 메시지를 띄우고 None)"""
+        from jobs import parse_targets, targets_for_offices
+        from runner import BookingJob
+        user_id = self.entry_id.get().strip()
+        password = self.entry_pw.get().strip()
+        if not user_id:
+            messagebox.showerror("오류", "아이디를 입력하세요.")
+            return None
+        if not password:
+            messagebox.showerror("오류", "비밀번호를 입력하세요.")
+            return None
+        if self.save_cred.get():
+            self.save_creds(user_id, password)
+
+        # 날짜
+        try:
+            target_date = self.selected_date()
+        except Exception:
+            messagebox.showerror("오류", "예약일을 선택하세요.")
+            return None
+
+        office_nos = [int(x) for x in self.entry_office.get().split(",") if x.strip()]
+        preferred_times = [k for k, v in self.time_vars.items() if v.get()]
+
+        form_data = {
+            "resident": self.resident.get(),
+            "phone": self.entry_phone.get().strip(),
+            "companion_count": int(self.entry_comp_cnt.get().strip() or "0"),
+            "companions": [s.strip() for s in self.entry_comp_names.get().split(",") if s.strip()]
+        }
+
+        # 입력값 검증
+        if not preferred_times:
+            messagebox.showerror("오류", "선호 시간을 하나 이상 선택하세요.")
+            return None
+
+        extra_ids = [s.strip() for s in self.entry_accounts.get().split(",") if s.strip() and s.strip() != user_id]
+        extra_accounts = []
+        if extra_ids:
+            from accounts import load_accounts
+            extra_accounts = load_accounts(extra_ids)
+            missing = sorted(set(extra_ids) - {uid for uid, _ in extra_accounts})
+            if missing:
+                messagebox.showerror("오류", f"저장된 비밀번호가 없는 계정: {', '.join(missing)}\n"
+                                           f"python accounts.py add 아이디 로 먼저 저장하세요.")
+                return None
+        if not form_data["phone"]:
+            messagebox.showerror("오류", "연락처를 입력하세요.")
+            return None
+
+        targets = None
+        extra_targets = parse_targets(self.entry_targets.get(), target_date, preferred_times, start=len(office_nos))
+        if extra_targets:
+            targets = targets_for_offices(office_nos, target_date, preferred_times) + extra_targets
+
+        return BookingJob(
+            user_id, password, target_date, office_nos, preferred_times, form_data,
+            engine="http" if self.engine.get() == ENGINE_HTTP else "browser",
+            race_profile=self.race_profile.get(),
+            inpage=self.race_mode.get() == RACE_INPAGE,
+            poll_ms=int(self.entry_poll_ms.get().strip() or "100"),
+            adaptive_retry=self.retry_mode.get() == RETRY_ADAPTIVE,
+            fire_adj_ms=float(self.entry_fire_adj.get().strip() or "0"),
+            burst_interval_ms=float(self.entry_burst_ms.get().strip() or "20"),
+            hedge=int(self.entry_hedge.get().strip() or "1"),
+            hedge_stagger_ms=float(self.entry_hedge_stagger.get().strip() or "30"),
+            accounts=extra_accounts,
+            shared_browser=self.shared_browser.get(),
+            targets=targets,
+        )
+
+    def run(self, job, profile: str):
+        """작업 스레드 — 위젯은 건드리지 않고 job 과 log_print/notify 만 사용"""
+        from runner import run_job
+        res = None
+        try:
+            tracing.start_run(date=job.date, offices=job.office_nos, hours=job.preferred_hours, engine=job.engine)
+            prebuilt = self.take_prelaunched(profile) if job.engine == "browser" else None
+            res = run_job(job, log=self.log_print, driver=prebuilt)
+            if res.status == "full":
+                self.log_print(f"❌ 예약 실패 — {res.detail}")
+                self.notify("warning", "실패", res.detail)
+            elif res.status == "error":
+                self.log_print(f"[예외] {res.detail}")
+                self.notify("error", "오류", res.detail)
             else:
-                self.log_print("❌ 예약 실패 — 선호 시간이 모두 매진이거나 제출이 거부되었습니다.")
-                messagebox.showwarning("실패", "예약에 실패했습니다. 선호 시간을 조정하거나 재시도해 보세요.")
+                self.report_result(res.success, job.engine == "http")
+                if res.duplicates:
+                    self.log_print(f"[경고] {res.detail}")
+                    self.notify("warning", "중복 예약", res.detail)
 
         except Exception as e:
             self.log_print(f"[예외] {e}")
-            messagebox.showerror("오류", str(e))
+            self.notify("error", "오류", str(e))
+        finally:
+            trace = tracing.end_run()
+            self.log_trace_summary(trace)
+            if res is not None:
+                self.record_history(res, trace)
+
+    def record_history(self, res, trace):
+        import history
+        try:
+            history.record_run(res, trace)
+        except Exception as e:
+            self.log_print(f"[경고] 실행 기록 저장 실패: {e}")
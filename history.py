@@ -0,0 +1,200 @@
+import os
+import sqlite3
+import statistics
+import datetime as dt
+from contextlib import closing
+from typing import List, Optional
+
+from config import DATA_DIR
+
+
+# --------- 실행 기록 저장소 (SQLite) ---------
+# 오픈 회차마다 발사 계획/실제, 서버 시계, 시도별 지연/결과를 남겨 다음 회차 보정에 쓴다.
+# 시도의 server_ms 는 "서버 시각 기준 오픈 후 몇 ms 에 요청이 도착했나" (발사 오차 + RTT/2 반영 추정치)
+
+DEFAULT_PATH = os.path.join(DATA_DIR, "history.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT, name TEXT, user_id TEXT, engine TEXT,
+    date TEXT, office_no INTEGER, weekday INTEGER,
+    open_at REAL, fire_lead_ms REAL, fire_error_ms REAL, fire_adj_ms REAL, burst_interval_ms REAL,
+    clock_offset_ms REAL, rtt_ms REAL,
+    status TEXT, won_office INTEGER, detail TEXT,
+    open_lo_ms REAL, open_hi_ms REAL, win_ms REAL
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    run_id INTEGER REFERENCES runs(id) ON DELETE CASCADE,
+    seq INTEGER, kind TEXT, server_ms REAL, dur_ms REAL, outcome TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_office_weekday ON runs(office_no, weekday);
+"""
+
+# 시도 한 번으로 세는 span (_SUBMIT_SPANS 는 이들 안에 없을 때만)
+_ITER_SPANS = ("retry_iter", "hedge_iter", "account_iter")
+_SUBMIT_SPANS = ("try_select_time_and_submit", "submit_from_layout")
+
+
+def _connect(path: Optional[str] = None) -> sqlite3.Connection:
+    path = path or DEFAULT_PATH
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _outcome(rec: dict) -> Optional[str]:
+    if "outcome" in rec:
+        return rec["outcome"]
+    if rec.get("error") == "NoAvailablePreferredTime":
+        return "full"
+    if "error" in rec:
+        return "error"
+    if "ok" in rec:
+        return "ok" if rec["ok"] else "failed"
+    return None
+
+
+def attempts_from_trace(trace, fire: dict) -> List[dict]:
+    """트레이스에서 오픈 이후 시도 목록 추출 → [{"kind", "server_ms", "dur_ms", "outcome"}] (시간순)"""
+    if trace is None or "lead_ms" not in fire:
+        return []
+    # run_job 의 마지막 wait_until 이 오픈 시각 발사
+    fired = [r for r in trace.records if r["type"] == "event" and r["name"] == "wait_until"]
+    if not fired:
+        return []
+    shot = fired[-1]
+    # 발사 직후 시각(트레이스 기준) → 서버 오픈 기준 도착 시각으로 환산
+    base = -shot["lead_ms"] + shot["error_ms"] + (fire.get("rtt_ms") or 0.0) / 2 - shot["start_ms"]
+
+    spans = [r for r in trace.records if r["type"] == "span" and r["start_ms"] >= shot["start_ms"]]
+    iters = [r for r in spans if r["name"] in _ITER_SPANS]
+    out = []
+    for r in spans:
+        if r["name"] in _SUBMIT_SPANS:
+            nested = any(i["thread"] == r["thread"] and i["start_ms"] <= r["start_ms"] <= i["start_ms"] + i["dur_ms"]
+                         for i in iters)
+            if nested:
+                continue
+        elif r["name"] not in _ITER_SPANS:
+            continue
+        outcome = _outcome(r)
+        if outcome is None:
+            continue  # 제출 전에 취소된 hedge 작업자, 캐시 배치가 안 맞아 넘어간 submit_from_layout 등
+        out.append({"kind": r["name"], "server_ms": r["start_ms"] + base, "dur_ms": r["dur_ms"], "outcome": outcome})
+    return sorted(out, key=lambda a: a["server_ms"])
+
+
+def _open_window(attempts: List[dict]):
+    """실제 오픈 시점 추정: (마지막 '오픈 전' 시도, 처음 열린 것을 본 시도) 의 server_ms"""
+    lo = hi = None
+    for a in attempts:
+        if a["outcome"] in ("ok", "failed"):
+            hi = a["server_ms"]
+            break
+        if a["outcome"] == "full":
+            lo = a["server_ms"]
+    return lo, hi
+
+
+def record_run(result, trace=None, path: Optional[str] = None) -> int:
+    """
+    run_job 결과(JobResult) + 그 실행의 트레이스를 저장. 새 run id 반환
+    여러 면을 돌린 실행은 시도가 어느 면 것인지 섞이므로 office_no 를 비워 두고(NULL) 면별 보정에서 뺀다
+    """
+    job, fire = result.job, result.fire
+    attempts = attempts_from_trace(trace, fire)
+    lo, hi = _open_window(attempts)
+    win = next((a["server_ms"] for a in attempts if a["outcome"] == "ok"), None)
+    open_at = fire.get("open_at")
+    weekday = dt.datetime.fromtimestamp(open_at).weekday() if open_at else None
+    with closing(_connect(path)) as conn, conn:
+        cur = conn.execute(
+            "INSERT INTO runs (started_at, name, user_id, engine, date, office_no, weekday, open_at, fire_lead_ms,"
+            " fire_error_ms, fire_adj_ms, burst_interval_ms, clock_offset_ms, rtt_ms, status, won_office, detail,"
+            " open_lo_ms, open_hi_ms, win_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((result.started_at or result.finished_at).isoformat(), job.name, job.user_id, job.engine,
+             job.date.isoformat(), job.office_nos[0] if len(job.office_nos) == 1 else None, weekday, open_at, fire.get("lead_ms"),
+             result.fire_error_ms, job.fire_adj_ms, job.burst_interval_ms, fire.get("offset_ms"), fire.get("rtt_ms"),
+             result.status, result.office_no, result.detail, lo, hi, win),
+        )
+        run_id = cur.lastrowid
+        conn.executemany(
+            "INSERT INTO attempts (run_id, seq, kind, server_ms, dur_ms, outcome) VALUES (?, ?, ?, ?, ?, ?)",
+            [(run_id, ix, a["kind"], a["server_ms"], a["dur_ms"], a["outcome"]) for ix, a in enumerate(attempts)],
+        )
+    return run_id
+
+
+# --------- 조회 ---------
+
+def recent_runs(limit: int = 20, office_no: Optional[int] = None, weekday: Optional[int] = None,
+                path: Optional[str] = None) -> List[dict]:
+    where, args = [], []
+    if office_no is not None:
+        where.append("office_no = ?"); args.append(office_no)
+    if weekday is not None:
+        where.append("weekday = ?"); args.append(weekday)
+    sql = "SELECT * FROM runs" + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY id DESC LIMIT ?"
+    with closing(_connect(path)) as conn:
+        return [dict(r) for r in conn.execute(sql, (*args, limit))]
+
+
+def run_attempts(run_id: int, path: Optional[str] = None) -> List[dict]:
+    with closing(_connect(path)) as conn:
+        return [dict(r) for r in conn.execute("SELECT * FROM attempts WHERE run_id = ? ORDER BY seq", (run_id,))]
+
+
+def win_rate(office_no: Optional[int] = None, weekday: Optional[int] = None, path: Optional[str] = None) -> dict:
+    runs = recent_runs(10_000, office_no, weekday, path)
+    won = sum(1 for r in runs if r["status"] == "success")
+    return {"runs": len(runs), "won": won, "rate": won / len(runs) if runs else None}
+
+
+def peak_latency_ms(office_no: int, weekday: int, window_ms: float = 1000, path: Optional[str] = None):
+    """오픈 후 window_ms 안의 시도 소요 시간 중앙값 (없으면 None)"""
+    with closing(_connect(path)) as conn:
+        rows = conn.execute(
+            "SELECT a.dur_ms FROM attempts a JOIN runs r ON a.run_id = r.id"
+            " WHERE r.office_no = ? AND r.weekday = ? AND a.server_ms BETWEEN 0 AND ?",
+            (office_no, weekday, window_ms)).fetchall()
+    return statistics.median(r[0] for r in rows) if rows else None
+
+
+# --------- 자동 보정 ---------
+
+def tune(office_no: int, weekday: int, *, retries_past_full: bool = False, min_runs: int = 3, last: int = 10,
+         path: Optional[str] = None) -> Optional[dict]:
+    """
+    같은 면/요일의 최근 기록으로 다음 회차의 발사 보정/버스트 간격을 고른다 (기록이 부족하면 None).
+    - 실제 오픈 시점 추정치(중앙값)만큼 늦게 쏘되, 버스트 간격 하나만큼 먼저 도착하게
+    - 오픈 전 화면(전부 마감)만 보고 끝난 회차는 '오픈은 이보다 늦다'는 하한으로 반영
+    - 버스트 간격: 오픈 시점 흩어짐(최대-최소)의 1/4, 10~100ms
+    - retries_past_full=False (고정 간격 재시도) 면 앞당기지 않는다: 일찍 도착해 오픈 전 화면을 보면
+      다음 시도까지 재시도 간격 전체를 잃음
+    반환 fire_adj_ms 는 GUI '발사 보정' 과 같은 의미 (+ 면 앞당김)
+    """
+    runs = [r for r in recent_runs(last, office_no, weekday, path)
+            if r["open_hi_ms"] is not None or r["open_lo_ms"] is not None]
+    if len(runs) < min_runs:
+        return None
+    # 첫 시도부터 열려 있었으면 실제 오픈은 그 이전 → 정시(0) 이후로는 추정하지 않음
+    opens = [(r["open_lo_ms"] + r["open_hi_ms"]) / 2 if r["open_lo_ms"] is not None else min(r["open_hi_ms"], 0.0)
+             for r in runs if r["open_hi_ms"] is not None]
+    lower = [r["open_lo_ms"] for r in runs if r["open_hi_ms"] is None]
+    open_ms = statistics.median(opens) if opens else statistics.median(lower)
+    if lower:
+        open_ms = max(open_ms, statistics.median(lower))
+    burst = min(100.0, max(10.0, (max(opens) - min(opens)) / 4)) if opens else 10.0
+    fire_adj = min(1000.0, max(-1000.0, -open_ms + burst))
+    if not retries_past_full:
+        fire_adj = min(fire_adj, 0.0)
+    return {
+        "fire_adj_ms": round(fire_adj),
+        "burst_interval_ms": round(burst),
+        "open_delay_ms": open_ms,
+        "peak_latency_ms": peak_latency_ms(office_no, weekday, path=path),
+        "runs": len(runs),
+    }
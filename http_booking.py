@@ -0,0 +1,348 @@
+import re
+import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+from config import LOGIN_URL, WRITE_URL_TMPL
+from utils import LoginRequired, NoAvailablePreferredTime, SubmitUnconfirmed
+from tracing import traced
+from retry_policy import FixedRetry, run_retry_loop
+from slot_parser import SlotPage, parse_slots
+
+
+# --------- HTTP 세션 ---------
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/126.0 Safari/537.36"
+)
+
+
+class HttpClient:
+    """
+    브라우저 없이 예약 흐름을 수행하는 keep-alive 세션.
+    booking.py 함수들이 받는 driver 자리에 그대로 넘길 수 있도록
+    current_url / page_source 속성을 유지한다.
+    """
+
+    def __init__(self, pool_size: int = 4, timeout: float = 5.0):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Connection": "keep-alive",
+            "Accept-Language": "ko-KR,ko;q=0.9",
+        })
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.current_url = ""
+        self.page_source = ""
+        self.selected_time: Optional[str] = None  # pick_time 에서 고른 wr_2 값
+        self.slot_page: Optional[SlotPage] = None  # 현재 페이지의 slot_parser 결과 (응답마다 초기화)
+
+    def _remember(self, resp: requests.Response) -> requests.Response:
+        resp.encoding = resp.encoding or "utf-8"
+        self.current_url = resp.url
+        self.page_source = resp.text
+        self.slot_page = None
+        return resp
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self._remember(self.session.get(url, **kwargs))
+
+    def post(self, url: str, data, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        headers = kwargs.pop("headers", {}) or {}
+        if self.current_url:
+            headers.setdefault("Referer", self.current_url)
+        return self._remember(self.session.post(url, data=data, headers=headers, **kwargs))
+
+    def quit(self):
+        self.session.close()
+
+
+def check_login(client: HttpClient) -> bool:
+    """로그인 유지 여부 확인 (요청 자체가 세션 keep-alive 역할도 겸함)"""
+    client.get(LOGIN_URL)
+    return "logout" in client.page_source
+
+
+def prewarm(client: HttpClient, connections: int = None):
+    """
+    오픈 직전 커넥션 풀을 HEAD 요청으로 채워 둔다 (DNS 조회도 이때 끝남).
+    (동시에 보내야 풀에 연결이 여러 개 생김 — 첫 요청이 TCP/TLS 핸드셰이크를 건너뜀)
+    """
+    parts = urlsplit(LOGIN_URL)
+    root = f"{parts.scheme}://{parts.netloc}/"
+    n = connections or client.pool_size
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        list(pool.map(lambda _: client.session.head(root, timeout=client.timeout), range(n)))
+
+
+def clone_session(client: HttpClient) -> HttpClient:
+    """로그인 쿠키를 공유하는 새 클라이언트 (병렬 작업자용)"""
+    clone = HttpClient(pool_size=client.pool_size, timeout=client.timeout)
+    clone.session.cookies = client.session.cookies.copy()
+    return clone
+
+
+# --------- 폼 파싱 ---------
+
+def _form_fields(form) -> dict:
+    """폼의 기본 제출값(hidden/text/checked radio/select/textarea) 수집"""
+    fields = {}
+    for el in form.find_all(["input", "select", "textarea"]):
+        name = el.get("name")
+        if not name or el.has_attr("disabled"):
+            continue
+        if el.name == "input":
+            typ = (el.get("type") or "text").lower()
+            if typ in ("radio", "checkbox"):
+                if el.has_attr("checked"):
+                    fields[name] = el.get("value", "on")
+            elif typ not in ("submit", "button", "image", "file", "reset"):
+                fields[name] = el.get("value", "")
+        elif el.name == "select":
+            opt = el.find("option", selected=True) or el.find("option")
+            fields[name] = opt.get("value", opt.get_text()) if opt else ""
+        else:
+            fields[name] = el.get_text()
+    return fields
+
+
+def _write_page(client: HttpClient) -> Optional[SlotPage]:
+    """현재 작성 페이지의 슬롯 + fwrite 기본값 (pick_time / fill_and_submit_form 이 한 번만 파싱)"""
+    if client.slot_page is None:
+        client.slot_page = parse_slots(client.page_source, stop_early=False)
+    return client.slot_page
+
+
+def read_slots(client: HttpClient, full_form: bool = False) -> Optional[SlotPage]:
+    """booking.read_slots 와 같은 자리 (이미 받은 응답을 파싱하므로 full_form 과 상관없이 폼 전체)"""
+    return _write_page(client)
+
+
+# 그누보드 alert.php 응답: 본문이 곧바로 <script>alert("...") 로 시작 (본문 중간의 인라인 JS alert( 는 해당 없음)
+_ALERT_PAGE_RE = re.compile(r'(?:<body[^>]*>|\A)\s*<script[^>]*>\s*alert\(\s*(["\'])(.*?)\1\s*\)', re.S | re.I)
+
+
+def _alert_message(html: str) -> Optional[str]:
+    """그누보드 alert 페이지면 메시지 반환 (아니면 None)"""
+    m = _ALERT_PAGE_RE.search(html)
+    return m.group(2) if m else None
+
+
+# --------- 페이지 동작 ---------
+
+@traced("login")
+def login(client: HttpClient, user_id: str, password: str, timeout: int = 20) -> bool:
+    """로그인 페이지의 mb_id 폼을 찾아 그대로 POST"""
+    client.get(LOGIN_URL, timeout=timeout)
+    if "logout" in client.page_source:
+        return True  # 이미 로그인된 세션
+    soup = BeautifulSoup(client.page_source, "html.parser")
+    id_input = soup.find("input", attrs={"name": "mb_id"})
+    form = id_input.find_parent("form") if id_input else None
+    if form is None:
+        raise RuntimeError("로그인 폼(mb_id)을 찾을 수 없습니다.")
+
+    data = _form_fields(form)
+    data["mb_id"] = user_id
+    data["mb_password"] = password
+    action = urljoin(client.current_url, form.get("action") or client.current_url)
+    client.post(action, data, timeout=timeout)
+    return "logout" in client.page_source
+
+
+
+@traced("open_write_page")
+def open_write_page(client: HttpClient, office_no: int, target_date: dt.date, timeout: int = 20):
+    """예약 작성 페이지 GET"""
+    url = WRITE_URL_TMPL.format(office_no=office_no, date=target_date.strftime("%Y-%m-%d"))
+    client.get(url, timeout=timeout)
+    if 'id="fwrite"' not in client.page_source and "id='fwrite'" not in client.page_source:
+        msg = _alert_message(client.page_source)
+        if msg and ("회원" in msg or "로그인" in msg):
+            raise LoginRequired(msg)
+        raise RuntimeError(msg or "작성 페이지(fwrite)를 열 수 없습니다.")
+    return True
+
+
+
+@traced("pick_time")
+def pick_time(client: HttpClient, preferred_hours: List[str], timeout: int = 10) -> bool:
+    """
+    booking.pick_time 과 같은 규칙:
+    - 선호 시간 라디오가 존재하되 모두 disabled면 NoAvailablePreferredTime 발생
+    - 하나라도 고르면 True, (선호 시간이 페이지에 아예 없으면 False)
+    """
+    client.selected_time = None
+    page = _write_page(client)
+    if page is None:
+        return False
+
+    seen_preferred = False
+    for hh in preferred_hours:
+        val = hh + ":00"
+        slot = page.find(val)
+        if slot is None:
+            continue
+
+        seen_preferred = True
+        if not slot.available:
+            continue
+
+        client.selected_time = val
+        return True
+
+    if seen_preferred:
+        raise NoAvailablePreferredTime("선호한 시간대가 모두 예약 불가(disabled)입니다.")
+    return False
+
+
+
+@traced("fill_and_submit_form")
+def fill_and_submit_form(
+    client: HttpClient,
+    *,
+    resident: str,
+    phone: str,
+    companion_count: int,
+    companions: List[str],
+    timeout: int = 10
+) -> bool:
+    """
+    fwrite 폼 기본값 + 입력값으로 바로 POST. 응답이 write.php를 벗어나면 성공, alert 거절이면 False
+    응답이 없거나 성공도 거절도 아니면 SubmitUnconfirmed (이미 예약됐을 수 있음)
+    """
+    if not client.selected_time:
+        return False
+    page = _write_page(client)
+    if page is None or not page.complete:
+        return False
+    return _post_booking(client, page.fields, page.checkboxes, page.action, client.current_url,
+                         resident=resident, phone=phone, companion_count=companion_count,
+                         companions=companions, timeout=timeout)
+
+
+def _post_booking(client: HttpClient, fields: dict, checkboxes: dict, action: Optional[str], base_url: str, *,
+                  resident: str, phone: str, companion_count: int, companions: List[str],
+                  timeout: int) -> bool:
+    """
+    폼 기본값에 선택 시간/입력값을 얹어 POST (작성 페이지 응답 또는 캐시된 배치 공용)
+    True: write.php 를 벗어남(성공) / False: 그누보드 alert 페이지(거절)
+    요청이 끊기거나(타임아웃 등) 둘 다 아닌 응답이면 SubmitUnconfirmed — 서버는 처리했을 수 있으므로
+    호출 측은 다른 시간으로 다시 제출하면 안 된다.
+    """
+    data = dict(fields)
+    data["wr_2"] = client.selected_time
+    data["wr_4"] = resident
+    data["wr_5"] = str(companion_count)
+    data["wr_6"] = (", ".join(companions) if companions else "동반자미상") if companion_count > 0 else ""
+    data["wr_subject"] = phone
+    if "agree" in checkboxes:
+        data["agree"] = checkboxes["agree"]
+
+    # 그누보드 write_token (페이지 JS가 제출 직전에 받아오는 값)
+    if "token" in data and not data["token"]:
+        token_url = urljoin(base_url, "write_token.php")
+        try:
+            resp = client.session.post(token_url, data={"bo_table": data.get("bo_table", "booking")},
+                                       timeout=timeout)
+            data["token"] = resp.json().get("token", "")
+        except (requests.RequestException, ValueError):
+            pass
+
+    action = urljoin(base_url, action or "write_update.php")
+    try:
+        resp = client.post(action, data, timeout=timeout, headers={"Referer": base_url})
+    except requests.RequestException as e:
+        raise SubmitUnconfirmed(f"{client.selected_time} 제출 응답 없음: {e}") from e
+    if _alert_message(client.page_source) is not None:
+        return False
+    if resp.status_code >= 400 or "write.php" in client.current_url:
+        # 과부하 5xx 등: 처리됐는지 알 수 없음
+        raise SubmitUnconfirmed(f"{client.selected_time} 제출 결과를 알 수 없는 응답: "
+                                f"{resp.status_code} {client.current_url}")
+    return True
+
+
+@traced("submit_from_layout")
+def submit_from_layout(client: HttpClient, layout, office_no: int, target_date: dt.date, preferred_times,
+                       form_data, timeout: int = 10) -> Optional[bool]:
+    """
+    오픈 전에 캐시한 슬롯 배치(slot_layout.SlotLayout)로 작성 페이지 GET 없이 1지망을 바로 POST.
+    True: 성공 / None: 배치에 선호 시간이 없거나 서버가 alert 로 거절
+    (None 이면 작성 페이지를 새로 받아 둔 상태 → 호출 측이 try_select_time_and_submit 으로 이어서)
+    거절된 뒤 새 페이지에서도 선호 시간이 전부 disabled 면 NoAvailablePreferredTime
+    (브라우저 경로의 all_disabled 와 같음 — 오픈 전 화면이면 호출 측이 재시도, 실행 기록에도 'full' 로 남음)
+    응답이 성공도 거절도 아니거나 요청이 중간에 끊기면 SubmitUnconfirmed (_post_booking)
+    """
+    slots = layout.preferred(preferred_times)
+    rejected = False
+    # 1지망이 배치에 없으면(배치가 오래됐을 수 있음) 낮은 순위 시간을 먼저 쏘지 않고 페이지에서 찾는다
+    if slots and slots[0][0] == preferred_times[0] + ":00":
+        client.selected_time = slots[0][0]
+        url = WRITE_URL_TMPL.format(office_no=office_no, date=target_date.strftime("%Y-%m-%d"))
+        if _post_booking(
+            client, layout.fields, layout.checkboxes, layout.action, url,
+            resident=form_data["resident"],
+            phone=form_data["phone"],
+            companion_count=int(form_data.get("companion_count", 0)),
+            companions=form_data.get("companions", []),
+            timeout=timeout,
+        ):
+            return True
+        rejected = True
+    open_write_page(client, office_no, target_date, timeout=timeout)
+    if rejected:
+        pick_time(client, preferred_times, timeout=timeout)
+    return None
+
+
+
+
+@traced("try_select_time_and_submit")
+def try_select_time_and_submit(client: HttpClient, preferred_times, form_data, timeout: int = 10) -> bool:
+    """
+    시간 선택 → 폼 채움 → 제출. 실패 시 False / 선호 전부 불가면 NoAvailablePreferredTime 예외 전달
+    제출 결과를 알 수 없으면 SubmitUnconfirmed 를 그대로 올린다 (False 로 바꾸면 재시도가 다음 시간을 또 예약함)
+    """
+    picked = pick_time(client, preferred_times, timeout=timeout)
+    if not picked:
+        return False
+
+    try:
+        return fill_and_submit_form(
+            client,
+            resident=form_data["resident"],
+            phone=form_data["phone"],
+            companion_count=int(form_data.get("companion_count", 0)),
+            companions=form_data.get("companions", []),
+            timeout=timeout
+        )
+    except SubmitUnconfirmed:
+        raise
+    except Exception:
+        return False
+
+
+
+
+def fast_retry_loop(client: HttpClient, office_no, target_date, preferred_times, form_data, retry_seconds: int = 60,
+                    policy=None) -> bool:
+    """booking.fast_retry_loop 과 동일한 재시도 루프 (HTTP 버전)"""
+    def attempt():
+        open_write_page(client, office_no, target_date)
+        return try_select_time_and_submit(client, preferred_times, form_data)
+
+    return run_retry_loop(attempt, policy or FixedRetry(retry_seconds),
+                          errors=(requests.RequestException, RuntimeError))
@@ -0,0 +1,383 @@
+import time
+import threading
+import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+import tracing
+from utils import NoAvailablePreferredTime, SubmitUnconfirmed
+
+
+# --------- 작업 모델 ---------
+
+class BookingTarget:
+    """예약 대상 하나: (면, 날짜, 선호 시간) + 우선순위(작을수록 먼저)"""
+
+    def __init__(self, office_no: int, date: dt.date, preferred_hours: List[str], priority: int = 0):
+        self.office_no = office_no
+        self.date = date
+        self.preferred_hours = list(preferred_hours)
+        self.priority = priority
+
+    def __repr__(self):
+        return f"{self.date} 면{self.office_no} {self.preferred_hours}"
+
+
+def targets_for_offices(office_nos: List[int], date: dt.date, preferred_hours: List[str]) -> List[BookingTarget]:
+    """입력 순서대로 우선순위를 매긴 면별 대상 목록"""
+    return [BookingTarget(no, date, preferred_hours, priority=ix) for ix, no in enumerate(office_nos)]
+
+
+def parse_targets(spec: str, default_date: dt.date, default_hours: List[str], start: int = 0) -> List[BookingTarget]:
+    """
+    "면:날짜[:시간,시간]; ..." → 대상 목록 (GUI '추가 대상' 칸, 우선순위는 start 부터 입력 순서)
+    날짜는 YYYY-MM-DD 또는 MM-DD (연도는 default_date 의 연도), 시간을 빼면 default_hours
+    예) "2:05-02:07,09; 3:2025-05-03"
+    """
+    targets = []
+    for ix, part in enumerate(p.strip() for p in spec.split(";") if p.strip()):
+        fields = [f.strip() for f in part.split(":")]
+        if len(fields) not in (2, 3):
+            raise ValueError(f"대상 형식은 면:날짜[:시간,시간] 입니다: {part}")
+        day = fields[1] if fields[1].count("-") == 2 else f"{default_date.year}-{fields[1]}"
+        hours = [f"{int(h):02d}" for h in fields[2].split(",") if h.strip()] if len(fields) == 3 else default_hours
+        targets.append(BookingTarget(int(fields[0]), dt.date.fromisoformat(day), hours or default_hours,
+                                     priority=start + ix))
+    return targets
+
+
+# --------- 병렬 실행 ---------
+
+def run_targets(
+    engine,
+    handles: list,
+    targets: List[BookingTarget],
+    form_data,
+    *,
+    retry_seconds: int = 60,
+    interval: float = 0.3,
+    opened_by: float = 0.0,
+    log: Optional[Callable[[str], None]] = None,
+) -> Optional[BookingTarget]:
+    """
+    대상마다 작업자 하나(handles[i] = 로그인된 driver/HttpClient)를 붙여 동시에 재시도.
+    - engine: booking 또는 http_booking 모듈
+    - 페이지 조회는 병렬, 제출(POST)은 한 번에 하나씩: 제출 직전에 잠금을 잡고 아직 아무도 성공하지
+      않았을 때만 보낸다 → 여러 면이 동시에 예약되는 일이 없음
+    - 하나라도 성공하면 나머지 작업자는 제출하지 않고 종료
+    - opened_by(epoch) 전에 시작한 시도의 '전부 마감'은 오픈 전 화면으로 보고 계속 재시도
+    - 결과를 알 수 없는 제출이 있으면 모두 멈추고, 성공한 대상이 없으면 SubmitUnconfirmed 를 올린다
+    반환: 성공한 대상 (없으면 None)
+    """
+    log = log or (lambda msg: None)
+    ordered = sorted(zip(targets, handles), key=lambda th: th[0].priority)
+    won = threading.Event()
+    lock = threading.Lock()
+    winners = []
+    unconfirmed = []
+
+    def worker(target: BookingTarget, handle) -> bool:
+        end_t = time.time() + retry_seconds
+        while time.time() < end_t and not won.is_set():
+            t0 = time.time()
+            with tracing.span("retry_iter", office_no=target.office_no, date=target.date) as rec:
+                try:
+                    engine.open_write_page(handle, target.office_no, target.date)
+                    # 대상을 잡고 제출: 다른 작업자의 제출 결과가 나올 때까지 기다렸다가, 성공했으면 취소
+                    with lock:
+                        if won.is_set():
+                            rec["cancelled"] = True
+                            return False
+                        try:
+                            rec["ok"] = engine.try_select_time_and_submit(handle, target.preferred_hours, form_data)
+                        except SubmitUnconfirmed:
+                            won.set()  # 결과를 모르는 제출 뒤에는 아무도 더 제출하지 않음 (잠금 안에서)
+                            raise
+                        if rec["ok"]:
+                            winners.append(target)
+                            won.set()
+                except NoAvailablePreferredTime:
+                    rec["outcome"] = "full"
+                    if t0 < opened_by:
+                        time.sleep(interval)
+                        continue
+                    log(f"{target}: 선호 시간 모두 마감 — 작업 종료")
+                    return False
+                except SubmitUnconfirmed as e:
+                    # 이미 예약됐을 수 있음 → 다른 작업자도 더 제출하지 않게 멈춘다
+                    rec["outcome"] = "error"
+                    rec["error"] = type(e).__name__
+                    log(f"[경고] {target}: {e} — 예약 내역을 직접 확인하세요")
+                    unconfirmed.append(f"{target}: {e}")
+                    return False
+                except Exception as e:
+                    rec["ok"], rec["outcome"] = False, "error"
+                    rec["error"] = type(e).__name__
+                    time.sleep(interval)
+                    continue
+                rec["outcome"] = "ok" if rec["ok"] else "failed"
+                if rec["ok"]:
+                    return True
+            time.sleep(interval)
+        return False
+
+    with ThreadPoolExecutor(max_workers=len(ordered)) as pool:
+        futures = {pool.submit(tracing.bind(worker), target, handle): target for target, handle in ordered}
+        for fut, target in futures.items():
+            try:
+                fut.result()
+            except Exception as e:
+                log(f"{target}: [경고] 작업 중단: {e}")
+
+    if not winners and unconfirmed:
+        raise SubmitUnconfirmed(unconfirmed[0])
+    return winners[0] if winners else None
+
+
+# --------- 중복 제출 (hedging) ---------
+
+class HedgeResult:
+    """winner: 처음 성공한 작업자 번호 (없으면 None), duplicates: 그 뒤에 또 성공한 작업자 (중복 예약)"""
+
+    def __init__(self):
+        self.winner: Optional[int] = None
+        self.winner_slot: Optional[str] = None
+        self.duplicates: List[tuple] = []   # [(작업자 번호, 시간), ...]
+        self.attempts = 0
+        self.full = False                   # 선호 시간이 모두 마감 (아무도 성공 못 함)
+        self.unconfirmed: Optional[str] = None  # 결과를 알 수 없는 제출 (이미 예약됐을 수 있음)
+
+    @property
+    def success(self) -> bool:
+        return self.winner is not None
+
+
+def run_hedged(
+    engine,
+    handles: list,
+    office_no: int,
+    date: dt.date,
+    preferred_hours: List[str],
+    form_data,
+    *,
+    stagger: float = 0.03,
+    retry_seconds: int = 60,
+    interval: float = 0.3,
+    opened_by: float = 0.0,
+    log: Optional[Callable[[str], None]] = None,
+) -> HedgeResult:
+    """
+    같은 (면, 날짜, 시간, 폼) 제출을 여러 세션(handles = 로그인된 driver/HttpClient)으로 stagger 초씩
+    어긋나게 동시에 보낸다. 느린 응답 하나에 오픈 순간이 좌우되지 않도록 하는 용도.
+    - 시간은 처음 페이지를 읽은 작업자가 한 번만 고르고(pinned), 모든 작업자가 그 시간만 제출한다
+      (각자 고르면 먼저 성공한 세션 때문에 다음 시간을 또 예약하게 됨)
+    - 고른 시간이 마감으로 보이면, 아직 응답을 기다리는 우리 제출이 없을 때만 다음 선호 시간으로 바꾼다
+    - 하나라도 성공하면 아직 제출 전인 작업자는 모두 취소 (이미 보낸 요청은 되돌릴 수 없음)
+    - 첫 성공 뒤에 또 성공한 작업자는 중복 예약으로 기록 → 사이트에서 직접 취소해야 함
+    - opened_by(epoch) 전에 읽은 '마감'은 오픈 전 화면일 수 있으므로 마감으로 치지 않는다
+    """
+    log = log or (lambda msg: None)
+    done = threading.Event()        # 성공 또는 전부 마감
+    lock = threading.Lock()
+    result = HedgeResult()
+    pinned: List[str] = []          # [고른 시간] (없으면 아직 안 고름)
+    gone = set()                    # 마감 확인된 선호 시간
+    inflight = [0]                  # 응답을 기다리는 제출 수
+
+    def pin(handle, t0: float) -> Optional[str]:
+        """lock 안에서 호출: 고른 시간 (아직 없으면 이 작업자의 페이지로 고름, t0 = 페이지를 연 시각)"""
+        if pinned:
+            return pinned[0]
+        page = engine.read_slots(handle)
+        avail = page.available() if page else {}
+        left = [hh for hh in preferred_hours if hh not in gone]
+        hh = next((hh for hh in left if avail.get(hh + ":00")), None)
+        if hh is not None:
+            pinned.append(hh)
+            log(f"제출 시간 고정: {hh}:00")
+        elif inflight[0] == 0 and t0 >= opened_by and (not left or any(hh + ":00" in avail for hh in left)):
+            result.full = True
+            done.set()
+        return hh
+
+    def submit(ix: int, handle, rec: dict) -> bool:
+        """한 번 시도: 페이지 열기 → (고정된) 시간 하나만 제출. 성공하면 True"""
+        t0 = time.time()
+        engine.open_write_page(handle, office_no, date)
+        with lock:
+            hh = None if done.is_set() else pin(handle, t0)
+            if hh is not None:
+                result.attempts += 1
+                inflight[0] += 1
+        if hh is None:
+            if result.full:
+                rec["outcome"] = "full"
+            elif done.is_set():
+                rec["cancelled"] = True
+            else:
+                rec["outcome"] = "failed"
+            return False
+        rec["slot"] = hh
+        try:
+            rec["ok"] = engine.try_select_time_and_submit(handle, [hh], form_data)
+        except NoAvailablePreferredTime:
+            rec["outcome"] = "full"
+            with lock:
+                inflight[0] -= 1
+                # 우리 다른 제출이 응답 대기 중이면 그게 가져간 것일 수 있으니 시간을 바꾸지 않는다
+                if inflight[0] == 0 and not done.is_set() and pinned == [hh] and t0 >= opened_by:
+                    gone.add(hh)
+                    pinned.clear()
+                    log(f"작업자 {ix}: {hh}:00 마감 — 다음 선호 시간으로")
+            return False
+        except SubmitUnconfirmed as e:
+            # 이미 예약됐을 수 있으므로 다른 시간으로 바꾸지도, 더 제출하지도 않는다
+            rec["outcome"] = "error"
+            rec["error"] = type(e).__name__
+            with lock:
+                inflight[0] -= 1
+                if result.unconfirmed is None:
+                    result.unconfirmed = str(e)
+                done.set()
+            return False
+        except Exception:
+            rec["ok"] = False
+        with lock:
+            inflight[0] -= 1
+            rec["outcome"] = "ok" if rec["ok"] else "failed"
+            if not rec["ok"]:
+                return False
+            if result.winner is None:
+                result.winner, result.winner_slot = ix, hh + ":00"
+                done.set()
+            else:
+                result.duplicates.append((ix, hh + ":00"))
+                tracing.event("hedge_duplicate", worker=ix, slot=hh + ":00")
+        return True
+
+    def worker(ix: int, handle) -> None:
+        if done.wait(ix * stagger):
+            return
+        end_t = time.time() + retry_seconds
+        while time.time() < end_t and not done.is_set():
+            with tracing.span("hedge_iter", worker=ix, office_no=office_no, date=date) as rec:
+                try:
+                    if submit(ix, handle, rec):
+                        return
+                except Exception:
+                    rec["ok"], rec["outcome"] = False, "error"
+            done.wait(interval)
+
+    with ThreadPoolExecutor(max_workers=len(handles)) as pool:
+        for ix, handle in enumerate(handles):
+            pool.submit(tracing.bind(worker), ix, handle)
+
+    if result.winner is not None:
+        log(f"작업자 {result.winner} 성공 {result.winner_slot} (제출 {result.attempts}회)")
+    elif result.unconfirmed:
+        log(f"[경고] {result.unconfirmed} — 예약 내역을 직접 확인하세요")
+    elif result.full:
+        log("선호 시간 모두 마감 — 중복 제출 종료")
+    for ix, slot in result.duplicates:
+        log(f"[경고] 중복 예약: 작업자 {ix} ({slot}) — 사이트에서 직접 취소하세요")
+    return result
+
+
+# --------- 여러 계정 (공유 슬롯 점유 표) ---------
+
+def run_accounts(
+    engine,
+    handles: dict,
+    office_nos: List[int],
+    date: dt.date,
+    preferred_hours: List[str],
+    form_data,
+    claims,
+    *,
+    max_per_account: int = 1,
+    retry_seconds: int = 60,
+    interval: float = 0.3,
+    opened_by: float = 0.0,
+    log: Optional[Callable[[str], None]] = None,
+) -> List[tuple]:
+    """
+    계정마다(handles = {아이디: 로그인된 driver/HttpClient}) 서로 다른 (면, 시간)을 맡겨 동시에 예약.
+    - 시작 시 (시간 우선, 면 순) 슬롯 목록을 계정에 번갈아 배정 → claims(claims.ClaimTable)에 점유 기록
+    - 각 계정은 자기가 점유한 슬롯만 시도하고, 다 떨어지면 아무도 맡지 않은 다음 슬롯을 가져온다
+    - 누가 성공한 슬롯은 won, 마감된 슬롯은 gone 으로 표시되어 어떤 계정도 다시 시도하지 않음
+      (opened_by(epoch) 전에 본 '마감'은 오픈 전 화면일 수 있으므로 gone 으로 치지 않음)
+    반환: [(계정, 면, 시간)] 성공 목록
+    """
+    log = log or (lambda msg: None)
+    slots = [(no, date, hh) for hh in preferred_hours for no in office_nos]
+    accounts = list(handles)
+    claims.claim_many([(accounts[ix % len(accounts)], slot) for ix, slot in enumerate(slots)])
+    won = []
+    won_lock = threading.Lock()
+
+    def worker(account: str, handle):
+        wins = 0
+        end_t = time.time() + retry_seconds
+        while time.time() < end_t and wins < max_per_account:
+            mine = claims.owned(account, claims.open_slots(slots))
+            if not mine:
+                if not claims.open_slots(slots):
+                    return  # 전부 성공/마감
+                nxt = claims.claim_next(account, slots)
+                if nxt is None:
+                    time.sleep(interval)  # 남은 슬롯은 다른 계정이 시도 중 (ttl 만료 시 가져감)
+                    continue
+                mine = [nxt]
+            # 점유 갱신 (ttl) — 파일 왕복 1회. 그새 만료돼 다른 계정이 가져간 슬롯은 뺀다
+            kept = claims.claim_many([(account, s) for s in mine])
+            mine = [s for s, ok in zip(mine, kept) if ok]
+            if not mine:
+                continue
+            office_no = mine[0][0]
+            hours = [hh for no, _, hh in mine if no == office_no]
+
+            t0 = time.time()
+            with tracing.span("account_iter", account=account, office_no=office_no, hours=hours) as rec:
+                try:
+                    engine.open_write_page(handle, office_no, date)
+                    rec["ok"] = engine.try_select_time_and_submit(handle, hours, form_data)
+                except NoAvailablePreferredTime:
+                    rec["outcome"] = "full"
+                    if t0 < opened_by:
+                        time.sleep(interval)
+                        continue
+                    claims.mark_gone(office_no, date, hours)
+                    log(f"[{account}] 면{office_no} {hours} 마감")
+                    continue
+                except SubmitUnconfirmed as e:
+                    # 이 계정으로 예약됐을 수 있으므로 이 계정은 더 제출하지 않는다
+                    rec["outcome"] = "error"
+                    rec["error"] = type(e).__name__
+                    log(f"[경고] [{account}] 면{office_no} {e} — 예약 내역을 직접 확인하세요")
+                    break
+                except Exception:
+                    rec["ok"] = False
+                rec["outcome"] = "ok" if rec["ok"] else "failed"
+            if rec["ok"]:
+                picked = getattr(handle, "selected_time", None)
+                hh = picked[:2] if picked else hours[0]
+                claims.mark_won(account, office_no, date, hh)
+                with won_lock:
+                    won.append((account, office_no, hh))
+                wins += 1
+                log(f"✅ [{account}] 면{office_no} {hh}:00 성공")
+                continue
+            time.sleep(interval)
+
+        # 더 시도하지 않을 슬롯은 다른 계정이 가져가도록 놓아준다
+        claims.release(account, slots)
+
+    with ThreadPoolExecutor(max_workers=len(accounts)) as pool:
+        futures = {pool.submit(tracing.bind(worker), account, handles[account]): account for account in accounts}
+        for fut, account in futures.items():
+            try:
+                fut.result()
+            except Exception as e:
+                log(f"[{account}] [경고] 작업 중단: {e}")
+
+    return won
@@ -1,5 +1,11 @@
-from gui import TennisGUI
+import sys
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # 인자가 있으면 Tk 없이 작업 파일 실행
+        from cli import main
+        sys.exit(main())
+
+    from gui import TennisGUI
     app = TennisGUI()
     app.mainloop()
@@ -26,7 +26,7 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx=False,  # onefile 은 매 실행마다 압축을 풀기 때문에 UPX 가 시작을 늦춘다
     upx_exclude=[],
     runtime_tmpdir=None,
     console=False,
@@ -0,0 +1,379 @@
+"""
+예약 사이트 로컬 대역 서버 (속도 개선을 자정의 실서버 없이 측정하기 위함)
+
+    python mock_server.py --port 8800 --open-in 10 --latency 30 --jitter 10 --deplete 2
+    python mock_server.py --open-in 10 --rivals 30 --arrival normal:0.3,0.2 --load-latency 2
+    TENNIS_BASE_URL=http://127.0.0.1:8800 python main.py
+"""
+import argparse
+import bisect
+import html
+import json
+import random
+import secrets
+import threading
+import time
+import datetime as dt
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def season_hours(date: dt.date) -> list:
+    """동절기(11~2월) 07~19시, 그 외 06~20시, 2시간 간격"""
+    # slot_layout.season_of 와 같은 규칙이지만 가져오지 않는다: slot_layout → config 가 import 시점에
+    # BASE_URL 을 고정하므로, TENNIS_BASE_URL 지정 전에 불리면(simulate.py 등) 실서버를 향하게 됨
+    start, end = (7, 19) if date.month in (11, 12, 1, 2) else (6, 20)
+    return [f"{h:02d}:00" for h in range(start, end + 1, 2)]
+
+
+# --------- 경쟁자 모델 ---------
+
+def parse_arrival(spec: str) -> Callable[[random.Random], float]:
+    """
+    오픈 기준 도착 시각(초) 분포: "normal:평균,표준편차" | "exp:평균" | "uniform:시작,끝" | "fixed:값"
+    음수는 오픈 전 대기 → 오픈 순간 도착으로 처리
+    """
+    kind, _, args = spec.partition(":")
+    a = [float(x) for x in args.split(",") if x]
+    if kind == "normal":
+        return lambda rng: rng.gauss(a[0], a[1])
+    if kind == "exp":
+        return lambda rng: rng.expovariate(1 / a[0])
+    if kind == "uniform":
+        return lambda rng: rng.uniform(a[0], a[1])
+    if kind == "fixed":
+        return lambda rng: a[0]
+    raise ValueError(f"알 수 없는 도착 분포: {spec}")
+
+
+class Rivals:
+    """
+    (면, 날짜) 페이지마다 n 명의 경쟁 클라이언트.
+    - arrival: 오픈 기준 도착 시각 분포 (parse_arrival)
+    - popular: 인기 순 시간 목록 ("06:00" ...) — 첫 지망은 zipf 가중치로 뽑고, 차 있으면 인기 순으로 다음 시간
+    - busy: 경쟁자 한 명이 도착 전후로 서버에 부하를 주는 시간(초)
+    """
+
+    def __init__(self, n: int, arrival: str = "normal:0.3,0.2", popular: Optional[List[str]] = None,
+                 zipf: float = 1.0, busy: float = 1.0):
+        self.n = n
+        self.arrival = parse_arrival(arrival)
+        self.popular = popular
+        self.zipf = zipf
+        self.busy = busy
+
+    def sample(self, rng: random.Random, hours: List[str]) -> List[tuple]:
+        """[(도착 초, 지망 순서 시간 목록)] 도착 순"""
+        order = [h for h in (self.popular or hours) if h in hours] + [h for h in hours if h not in (self.popular or [])]
+        weights = [1 / (rank + 1) ** self.zipf for rank in range(len(order))]
+        out = []
+        for _ in range(self.n):
+            first = rng.choices(order, weights)[0]
+            prefs = [first] + [h for h in order if h != first]
+            out.append((max(0.0, self.arrival(rng)), prefs))
+        return sorted(out, key=lambda r: r[0])
+
+
+# --------- 사이트 상태 ---------
+
+class MockSite:
+    """
+    - open_at: 예약 오픈 epoch (이전에는 모든 슬롯이 li.disabled)
+    - latency/jitter: 요청마다 추가되는 지연(초)
+    - deplete_per_sec: 오픈 후 가상 경쟁자가 슬롯을 가져가는 속도 (단순 모델)
+    - rivals: 경쟁 클라이언트 모델 (Rivals) — 도착 시각 분포 + 시간별 인기도로 슬롯을 가져감
+    - load_latency: 동시에 서버를 쓰는 클라이언트(처리 중 요청 + 활동 중인 경쟁자) 1명당 추가 지연(초)
+    """
+
+    def __init__(self, open_at: float = 0.0, latency: float = 0.0, jitter: float = 0.0,
+                 deplete_per_sec: float = 0.0, seed: int = 0, rivals: Optional[Rivals] = None,
+                 load_latency: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.deplete_per_sec = deplete_per_sec
+        self.rivals = rivals
+        self.load_latency = load_latency
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.inflight = 0
+        self.sessions = {}      # sid -> {"user": str|None, "token": str}
+        self.bookings = []      # (user, office_no, date, hour, epoch)
+        self.reset(open_at)
+
+    def reset(self, open_at: float = None, seed: int = None):
+        """슬롯/예약 초기화 (벤치마크 반복용). seed 를 주면 경쟁자 표본도 같은 값으로 다시 뽑음"""
+        with self.lock:
+            if open_at is not None:
+                self.open_at = open_at
+            if seed is not None:
+                self.rng = random.Random(seed)
+            self.taken = {}     # (office_no, date) -> {hour: "user" | "__rival__"}
+            self.depleted = {}  # (office_no, date) -> 가상 경쟁자가 가져간 개수
+            self.queue = {}     # (office_no, date) -> 아직 도착 안 한 경쟁자 [(도착 초, 지망)]
+            self.arrivals = []  # 전체 경쟁자 도착 시각 (부하 계산용, 정렬)
+            self.bookings = []
+
+    def active_rivals(self) -> int:
+        if not self.rivals or not self.arrivals:
+            return 0
+        t, half = time.time() - self.open_at, self.rivals.busy / 2
+        return bisect.bisect_right(self.arrivals, t + half) - bisect.bisect_left(self.arrivals, t - half)
+
+    def delay(self):
+        d = self.latency + (self.rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if self.load_latency:
+            d += self.load_latency * (self.inflight + self.active_rivals())
+        if d > 0:
+            time.sleep(d)
+
+    @contextmanager
+    def request(self):
+        """요청 하나 처리 구간: 동시 처리 수를 세고 지연을 준다"""
+        with self.lock:
+            self.inflight += 1
+        try:
+            self.delay()
+            yield
+        finally:
+            with self.lock:
+                self.inflight -= 1
+
+    def is_open(self) -> bool:
+        return time.time() >= self.open_at
+
+    def slots(self, office_no: int, date: dt.date) -> dict:
+        """{hour: 예약 가능 여부} — 호출 시점 기준으로 경쟁자 소진을 반영"""
+        key = (office_no, date)
+        with self.lock:
+            taken = self.taken.setdefault(key, {})
+            hours = season_hours(date)
+            if self.rivals and key not in self.queue:
+                self.queue[key] = self.rivals.sample(self.rng, hours)
+                for arrival, _ in self.queue[key]:
+                    bisect.insort(self.arrivals, arrival)
+            if self.is_open() and self.queue.get(key):
+                now, queue = time.time() - self.open_at, self.queue[key]
+                while queue and queue[0][0] <= now:
+                    arrival, prefs = queue.pop(0)
+                    hour = next((h for h in prefs if h not in taken), None)
+                    if hour:
+                        taken[hour] = "__rival__"
+            if self.is_open() and self.deplete_per_sec > 0:
+                due = int((time.time() - self.open_at) * self.deplete_per_sec)
+                while self.depleted.get(key, 0) < due:
+                    free = [h for h in hours if h not in taken]
+                    if not free:
+                        break
+                    taken[self.rng.choice(free)] = "__rival__"
+                    self.depleted[key] = self.depleted.get(key, 0) + 1
+            return {h: self.is_open() and h not in taken for h in hours}
+
+    def claim(self, user: str, office_no: int, date: dt.date, hour: str) -> bool:
+        if not self.slots(office_no, date).get(hour):
+            return False
+        with self.lock:
+            taken = self.taken.setdefault((office_no, date), {})
+            if hour in taken:
+                return False
+            taken[hour] = user
+            self.bookings.append((user, office_no, date, hour, time.time()))
+            return True
+
+
+# --------- 페이지 ---------
+
+def _page(body: str) -> bytes:
+    return (f'<!doctype html><html><head><meta charset="utf-8"><title>booking</title>'
+            f'<link rel="stylesheet" href="/css/default.css"></head><body>'
+            f'<div id="popup" class="pop">공지</div>{body}</body></html>').encode("utf-8")
+
+
+def _alert(msg: str) -> bytes:
+    """그누보드 alert.php 처럼 본문이 alert 스크립트뿐인 페이지"""
+    return (f'<!doctype html><html><head><meta charset="utf-8"><title>오류안내 페이지</title></head><body>'
+            f'<script>alert("{html.escape(msg)}");history.back();</script>'
+            f'<noscript><p>{html.escape(msg)}</p></noscript></body></html>').encode("utf-8")
+
+
+def render_login(logged_in: bool) -> bytes:
+    if logged_in:
+        return _page('<a href="/bbs/logout.php">로그아웃</a><div id="bo_list">booking</div>')
+    return _page(
+        '<form name="foutlogin" action="/bbs/login_check.php" method="post">'
+        '<input type="hidden" name="url" value="/bbs/board.php?bo_table=booking">'
+        '<input type="text" name="mb_id"><input type="password" name="mb_password">'
+        '<input type="submit" id="ol_submit" value="로그인"></form>'
+    )
+
+
+def render_booking_time(slots: dict) -> str:
+    items = []
+    for ix, (hour, ok) in enumerate(slots.items()):
+        dis = "" if ok else " disabled"
+        cls = "" if ok else ' class="disabled"'
+        items.append(f'<li{cls}><input type="radio" name="wr_2" id="wr_2_{ix}" value="{hour}"{dis}>'
+                     f'<label for="wr_2_{ix}" id="wr_2_label_{ix}">{hour}</label></li>')
+    return '<ul id="booking_time">' + "".join(items) + "</ul>"
+
+
+def render_write(office_no: int, date: dt.date, slots: dict, token: str) -> bytes:
+    return _page(
+        f'<form name="fwrite" id="fwrite" action="/bbs/write_update.php" method="post">'
+        f'<input type="hidden" name="w" value=""><input type="hidden" name="bo_table" value="booking">'
+        f'<input type="hidden" name="office_no" value="{office_no}">'
+        f'<input type="hidden" name="wr_1" value="{date.isoformat()}">'
+        f'<input type="hidden" name="token" value="{token}">'
+        f'{render_booking_time(slots)}'
+        '<label><input type="radio" name="wr_4" value="관내">관내</label>'
+        '<label><input type="radio" name="wr_4" value="관외">관외</label>'
+        '<select name="wr_5"><option value="0">0</option><option value="1">1</option>'
+        '<option value="2">2</option><option value="3">3</option></select>'
+        '<input type="text" name="wr_6"><input type="text" name="wr_subject">'
+        '<textarea name="wr_content">예약</textarea>'
+        '<input type="checkbox" name="agree" id="agree" value="1">'
+        '<button type="submit" id="btn_submit">예약하기</button></form>'
+    )
+
+
+# --------- HTTP 핸들러 ---------
+
+def make_handler(site: MockSite):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        disable_nagle_algorithm = True
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _session(self):
+            cookie = self.headers.get("Cookie", "")
+            for part in cookie.split(";"):
+                k, _, v = part.strip().partition("=")
+                if k == "PHPSESSID":
+                    with site.lock:
+                        if v in site.sessions:
+                            return v, site.sessions[v]
+            sid = secrets.token_hex(8)
+            with site.lock:
+                site.sessions[sid] = sess = {"user": None, "token": secrets.token_hex(8)}
+            return sid, sess
+
+        def _send(self, code: int, body: bytes = b"", sid: str = None, location: str = None,
+                  ctype: str = "text/html; charset=utf-8"):
+            self.send_response(code)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            if sid:
+                self.send_header("Set-Cookie", f"PHPSESSID={sid}; path=/")
+            if location:
+                self.send_header("Location", location)
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def _form(self) -> dict:
+            n = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(n).decode("utf-8") if n else ""
+            return {k: v[0] for k, v in parse_qs(raw, keep_blank_values=True).items()}
+
+        def do_HEAD(self):
+            self._send(200)
+
+        def do_GET(self):
+            with site.request():
+                self._get()
+
+        def do_POST(self):
+            with site.request():
+                self._post()
+
+        def _get(self):
+            sid, sess = self._session()
+            url = urlsplit(self.path)
+            q = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if url.path == "/bbs/board.php":
+                return self._send(200, render_login(sess["user"] is not None), sid)
+            if url.path == "/bbs/logout.php":
+                sess["user"] = None
+                return self._send(302, sid=sid, location="/bbs/board.php?bo_table=booking")
+            if url.path == "/bbs/write.php":
+                if sess["user"] is None:
+                    return self._send(200, _alert("회원만 이용하실 수 있습니다."), sid)
+                office_no = int(q.get("office_no", 1))
+                date = dt.date.fromisoformat(q.get("select", dt.date.today().isoformat()))
+                return self._send(200, render_write(office_no, date, site.slots(office_no, date), sess["token"]), sid)
+            if url.path.startswith("/css/"):
+                return self._send(200, b"body{}", sid, ctype="text/css")
+            self._send(404, b"not found", sid)
+
+        def _post(self):
+            sid, sess = self._session()
+            path = urlsplit(self.path).path
+            form = self._form()
+            if path == "/bbs/login_check.php":
+                if not form.get("mb_id") or not form.get("mb_password"):
+                    return self._send(200, _alert("아이디나 비밀번호가 공백이면 안됩니다."), sid)
+                sess["user"] = form["mb_id"]
+                return self._send(302, sid=sid, location=form.get("url") or "/bbs/board.php?bo_table=booking")
+            if path == "/bbs/write_token.php":
+                body = json.dumps({"error": "", "token": sess["token"]}).encode()
+                return self._send(200, body, sid, ctype="application/json")
+            if path == "/bbs/write_update.php":
+                if sess["user"] is None:
+                    return self._send(200, _alert("회원만 이용하실 수 있습니다."), sid)
+                if form.get("token") != sess["token"]:
+                    return self._send(200, _alert("토큰 에러로 삭제 불가합니다."), sid)
+                if not form.get("agree"):
+                    return self._send(200, _alert("개인정보 수집에 동의해 주세요."), sid)
+                if len(form.get("wr_subject", "")) < 9:
+                    return self._send(200, _alert("연락처를 입력해 주세요."), sid)
+                office_no = int(form.get("office_no", 1))
+                date = dt.date.fromisoformat(form.get("wr_1"))
+                if not site.claim(sess["user"], office_no, date, form.get("wr_2", "")):
+                    return self._send(200, _alert("이미 예약된 시간입니다."), sid)
+                return self._send(302, sid=sid, location=f"/bbs/board.php?bo_table=booking&wr_id={len(site.bookings)}")
+            self._send(404, b"not found", sid)
+
+    return Handler
+
+
+def serve(site: MockSite, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """백그라운드 스레드로 서버 시작. server.base_url 로 주소 확인"""
+    server = ThreadingHTTPServer((host, port), make_handler(site))
+    server.daemon_threads = True
+    server.base_url = f"http://{host}:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="예약 사이트 로컬 대역 서버")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8800)
+    ap.add_argument("--open-in", type=float, default=0.0, help="지금부터 몇 초 뒤 오픈")
+    ap.add_argument("--latency", type=float, default=0.0, help="ms")
+    ap.add_argument("--jitter", type=float, default=0.0, help="ms")
+    ap.add_argument("--deplete", type=float, default=0.0, help="오픈 후 초당 소진 슬롯 수")
+    ap.add_argument("--rivals", type=int, default=0, help="(면, 날짜)마다 경쟁 클라이언트 수")
+    ap.add_argument("--arrival", default="normal:0.3,0.2", help="경쟁자 도착 분포 (초, 오픈 기준)")
+    ap.add_argument("--load-latency", type=float, default=0.0, help="동시 클라이언트 1명당 추가 지연 (ms)")
+    args = ap.parse_args(argv)
+
+    site = MockSite(open_at=time.time() + args.open_in, latency=args.latency / 1000,
+                    jitter=args.jitter / 1000, deplete_per_sec=args.deplete,
+                    rivals=Rivals(args.rivals, args.arrival) if args.rivals else None,
+                    load_latency=args.load_latency / 1000)
+    server = serve(site, args.host, args.port)
+    print(f"mock booking site: {server.base_url}  (open at {dt.datetime.fromtimestamp(site.open_at)})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import time
+import threading
+import datetime as dt
+from typing import Callable, Dict, List, Optional, Tuple
+
+import tracing
+import http_booking
+from slot_parser import parse_slots
+from utils import LoginRequired, NoAvailablePreferredTime, SubmitUnconfirmed
+from warmup import ensure_login
+
+
+# --------- #booking_time 조각만 파싱 ---------
+
+def booking_time_slots(html: str) -> Optional[Dict[str, bool]]:
+    """작성 페이지에서 #booking_time 부분만 읽어 {"06:00": 예약가능여부} 반환 (없으면 None)"""
+    page = parse_slots(html)
+    return page.available() if page else None
+
+
+# --------- 취소표 감시 ---------
+
+class CancellationWatcher:
+    """
+    여러 (날짜, 면) 작성 페이지를 돌아가며 조회해 선호 시간이 disabled → enabled 로 바뀌면 on_free 호출.
+    - 한 바퀴(sweep)를 sweep_seconds 에 걸쳐 고르게 흩어서 요청 (초당 max_rps 이하)
+    - 상태는 (날짜, 면) 별 마지막 슬롯 맵 하나씩만 보관
+    scanner: 로그인된 http_booking.HttpClient (조회 전용, 예약은 on_free 가 담당)
+    credentials: (아이디, 비밀번호) — 주면 감시 중 세션이 풀렸을 때 scanner 를 다시 로그인
+    """
+
+    def __init__(self, scanner, dates: List[dt.date], office_nos: List[int], preferred_hours: List[str],
+                 *, sweep_seconds: float = 30.0, max_rps: float = 2.0,
+                 on_free: Optional[Callable[[dt.date, int, List[str]], bool]] = None,
+                 credentials: Optional[Tuple[str, str]] = None,
+                 log: Optional[Callable[[str], None]] = None):
+        self.scanner = scanner
+        self.pages: List[Tuple[dt.date, int]] = [(d, o) for d in dates for o in office_nos]
+        self.wanted = [hh + ":00" for hh in preferred_hours]
+        self.sweep_seconds = sweep_seconds
+        self.max_rps = max_rps
+        self.on_free = on_free
+        self.credentials = credentials
+        self.log = log or (lambda msg: None)
+        self.snapshot: Dict[Tuple[dt.date, int], Dict[str, bool]] = {}
+        self.stop_event = threading.Event()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _gap(self) -> float:
+        return max(self.sweep_seconds / max(1, len(self.pages)), 1.0 / self.max_rps)
+
+    def poll(self, date: dt.date, office_no: int) -> List[str]:
+        """한 페이지 조회 → 새로 열린 선호 시간 목록"""
+        with tracing.span("monitor_poll", date=date, office_no=office_no):
+            http_booking.open_write_page(self.scanner, office_no, date)
+            slots = booking_time_slots(self.scanner.page_source)
+        if slots is None:
+            return []
+        prev = self.snapshot.get((date, office_no))
+        self.snapshot[(date, office_no)] = slots
+        if prev is None:
+            return []  # 첫 조회는 기준값만 저장
+        return [h for h in self.wanted if slots.get(h) and not prev.get(h)]
+
+    def run(self, stop_on_success: bool = True) -> Optional[Tuple[dt.date, int]]:
+        """stop() 또는 (stop_on_success 일 때) 예약 성공까지 감시. 성공한 (날짜, 면) 반환"""
+        self.log(f"취소표 감시 시작: {len(self.pages)}개 페이지, 페이지당 {self._gap():.1f}초 간격")
+        while not self.stop_event.is_set():
+            for date, office_no in self.pages:
+                if self.stop_event.is_set():
+                    break
+                try:
+                    freed = self.poll(date, office_no)
+                except LoginRequired as e:
+                    freed = []
+                    if self.credentials is None:
+                        self.log(f"[경고] {date} 면{office_no} 조회 실패: {e}")
+                    else:
+                        self.log("[안내] 감시용 세션이 끊겨 다시 로그인합니다")
+                        if http_booking.login(self.scanner, *self.credentials) is False:
+                            self.log("[경고] 감시용 세션 재로그인 실패 — 계정 상태를 확인하세요")
+                except Exception as e:
+                    self.log(f"[경고] {date} 면{office_no} 조회 실패: {e}")
+                    freed = []
+                if freed:
+                    self.log(f"🔔 {date} 면{office_no}: {', '.join(freed)} 예약 가능")
+                    tracing.event("monitor_free", date=date, office_no=office_no, hours=freed)
+                    if self.on_free is not None:
+                        try:
+                            ok = self.on_free(date, office_no, [h[:2] for h in freed])
+                        except SubmitUnconfirmed as e:
+                            # 이미 예약됐을 수 있으므로 감시(다음 예약 시도)를 멈춘다
+                            self.log(f"[경고] {date} 면{office_no} {e} — 예약 내역을 직접 확인하세요")
+                            self.stop_event.set()
+                            return None
+                        except Exception as e:
+                            self.log(f"[경고] {date} 면{office_no} 예약 시도 실패: {e}")
+                            ok = False
+                        if ok and stop_on_success:
+                            self.stop_event.set()
+                            return date, office_no
+                        if not ok:
+                            # 예약을 못 했으면 다음 조회에서도 열려 있을 때 다시 시도하도록 되돌림
+                            for h in freed:
+                                self.snapshot[(date, office_no)][h] = False
+                self.stop_event.wait(self._gap())
+        return None
+
+
+def submit_on_free(engine, handle, form_data, log: Optional[Callable[[str], None]] = None,
+                   credentials: Optional[Tuple[str, str]] = None, recheck_after: float = 240):
+    """
+    on_free 콜백: 기존 try_select_time_and_submit 경로로 바로 예약 시도
+    credentials 를 주면, 마지막 사용 뒤 recheck_after 초 넘게 쉰 세션은 제출 전에 로그인 확인(풀렸으면 재로그인)
+    — 감시는 몇 시간씩 가므로 처음 로그인한 세션이 그대로 살아 있다고 보지 않는다
+    """
+    log = log or (lambda msg: None)
+    last_used = [time.monotonic()]
+
+    def on_free(date: dt.date, office_no: int, hours: List[str]) -> bool:
+        t0 = time.perf_counter()
+        try:
+            if credentials is not None and time.monotonic() - last_used[0] >= recheck_after:
+                ensure_login(engine, handle, *credentials, label="예약 세션", log=log)
+            last_used[0] = time.monotonic()
+            engine.open_write_page(handle, office_no, date)
+            ok = engine.try_select_time_and_submit(handle, hours, form_data)
+        except NoAvailablePreferredTime:
+            ok = False
+        except SubmitUnconfirmed:
+            raise
+        except LoginRequired as e:
+            log(f"[경고] {date} 면{office_no} 예약 세션이 끊김: {e}")
+            last_used[0] = float("-inf")  # 다음 시도 전에 다시 로그인
+            ok = False
+        except Exception as e:
+            # 몇 시간씩 도는 감시가 한 번의 페이지 오류/타임아웃으로 끝나지 않게
+            log(f"[경고] {date} 면{office_no} 예약 시도 중 오류: {e}")
+            ok = False
+        log(f"{date} 면{office_no} 예약 시도 → {'성공' if ok else '실패'} ({(time.perf_counter() - t0)*1000:.0f}ms)")
+        return ok
+
+    return on_free
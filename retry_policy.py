@@ -0,0 +1,147 @@
+import time
+import random
+from typing import Callable, Optional
+
+import tracing
+from utils import NoAvailablePreferredTime
+
+
+# --------- 재시도 정책 ---------
+# 매 시도 결과(outcome)와 그 시도에 걸린 시간(latency)을 보고 다음 대기 시간을 정한다.
+# outcome: "failed"(일반 실패) | "full"(선호 시간 전부 disabled) | "error"(요청/페이지 오류)
+# next_delay 가 None 을 돌려주면 재시도를 멈춘다.
+
+class FixedRetry:
+    """
+    기존 동작: interval 간격으로 duration 초 동안, 전부 마감이면 즉시 중단
+    opened_by(epoch) 전에 보낸 시도의 '전부 마감'은 아직 오픈 전 화면일 수 있으므로 중단하지 않음
+    """
+
+    def __init__(self, duration: float = 60, interval: float = 0.3, opened_by: float = 0.0):
+        self.duration = duration
+        self.interval = interval
+        self.opened_by = opened_by
+        self.started = 0.0
+
+    def start(self):
+        self.started = time.monotonic()
+
+    def next_delay(self, outcome: str, latency: float) -> Optional[float]:
+        if time.monotonic() - self.started >= self.duration:
+            return None
+        if outcome == "full" and time.time() - latency >= self.opened_by:
+            return None
+        return self.interval
+
+
+class AdaptiveRetry:
+    """
+    - 오픈 직후 burst_seconds 동안은 결과와 상관없이 burst_interval 로 촘촘히
+    - 이후에는 서버 응답이 느려진 만큼(처음 측정한 지연 대비) 간격을 늘리고 ±jitter 를 섞음
+    - 선호 시간이 전부 마감이면 full_interval 로 천천히 보다가 full_grace 초가 지나면 중단
+      (그 사이 취소로 슬롯이 풀리면 다시 일반 모드로 복귀)
+    매 결정은 트레이스(retry_decision)에 남기고, log 에는 모드가 바뀔 때/중단할 때만 한 줄씩 출력
+    """
+
+    def __init__(self, duration: float = 60, burst_seconds: float = 1.0, burst_interval: float = 0.02,
+                 base_interval: float = 0.1, max_interval: float = 2.0, jitter: float = 0.3,
+                 full_interval: float = 1.0, full_grace: float = 20.0,
+                 log: Optional[Callable[[str], None]] = None):
+        self.duration = duration
+        self.burst_seconds = burst_seconds
+        self.burst_interval = burst_interval
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.full_interval = full_interval
+        self.full_grace = full_grace
+        self.log = log
+        self.rng = random.Random()
+        self.started = 0.0
+        self.baseline = None
+        self.full_since = None
+        self.attempts = 0
+        self.mode = None      # 마지막으로 log 에 출력한 모드 (burst / full / backoff)
+        self.quiet = 0        # 그 뒤로 출력하지 않은 시도 수
+
+    def start(self):
+        self.started = time.monotonic()
+        self.baseline = None
+        self.full_since = None
+        self.attempts = 0
+        self.mode = None
+        self.quiet = 0
+
+    def _decide(self, outcome: str, latency: float):
+        now = time.monotonic()
+        elapsed = now - self.started
+        if elapsed >= self.duration:
+            return None, "duration"
+
+        # 오픈 직후에는 '전부 마감'도 오픈 전 화면일 수 있으므로 촘촘히 재시도
+        if elapsed < self.burst_seconds:
+            return self.burst_interval, "burst"
+
+        if outcome == "full":
+            self.full_since = self.full_since or now
+            if now - self.full_since >= self.full_grace:
+                return None, "full_grace"
+            return self.full_interval, "full"
+        self.full_since = None
+
+        if outcome != "error":
+            self.baseline = latency if self.baseline is None else min(self.baseline, latency)
+        slowdown = latency / self.baseline if self.baseline else 1.0
+        delay = min(self.max_interval, self.base_interval * max(1.0, slowdown))
+        delay *= 1 + self.rng.uniform(-self.jitter, self.jitter)
+        return delay, f"backoff x{slowdown:.1f}"
+
+    def next_delay(self, outcome: str, latency: float) -> Optional[float]:
+        self.attempts += 1
+        delay, reason = self._decide(outcome, latency)
+        tracing.event("retry_decision", attempt=self.attempts, outcome=outcome,
+                      latency_ms=latency * 1000, delay_ms=None if delay is None else delay * 1000, reason=reason)
+        if self.log:
+            mode = reason.split()[0]
+            if delay is None or mode != self.mode:
+                nxt = "중단" if delay is None else f"{delay*1000:.0f}ms 후"
+                skipped = f", 직전 {self.quiet}회 생략" if self.quiet else ""
+                self.log(f"[재시도 #{self.attempts}] {outcome} ({latency*1000:.0f}ms) → {nxt} ({reason}{skipped})")
+                self.mode, self.quiet = mode, 0
+            else:
+                self.quiet += 1
+        return delay
+
+
+# --------- 공용 재시도 루프 ---------
+
+def run_retry_loop(attempt: Callable[[], bool], policy, errors: tuple = ()) -> bool:
+    """
+    attempt() 를 정책에 따라 반복. 성공하면 True.
+    정책이 '전부 마감' 상태에서 멈추면 마지막 NoAvailablePreferredTime 을 그대로 올린다.
+    errors 에 든 예외는 "error" 결과로 보고 계속한다.
+    """
+    policy.start()
+    n = 0
+    while True:
+        n += 1
+        full = None
+        t0 = time.perf_counter()
+        with tracing.span("retry_iter", attempt=n) as rec:
+            try:
+                outcome = "ok" if attempt() else "failed"
+            except NoAvailablePreferredTime as e:
+                outcome, full = "full", e
+            except errors as e:
+                outcome = "error"
+                rec["error"] = type(e).__name__
+            rec["outcome"] = outcome
+        if outcome == "ok":
+            return True
+
+        delay = policy.next_delay(outcome, time.perf_counter() - t0)
+        if delay is None:
+            if full is not None:
+                raise full
+            return False
+        time.sleep(delay)
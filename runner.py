@@ -0,0 +1,388 @@
+import time
+import datetime as dt
+from typing import Callable, List, Optional, Tuple
+
+import booking
+import http_booking
+from booking import compute_open_time, wait_until
+from clock_sync import sync_server_clock
+from driver import build_driver
+from claims import ClaimTable
+from jobs import BookingTarget, targets_for_offices, run_targets, run_hedged, run_accounts
+from retry_policy import FixedRetry, AdaptiveRetry
+from sessions import SessionManager
+import slot_layout
+from utils import NoAvailablePreferredTime, SubmitUnconfirmed
+from warmup import keep_all_warm, prewarm_all
+
+
+# --------- 예약 작업 ---------
+
+class BookingJob:
+    """한 번의 예약 실행에 필요한 입력 전체 (GUI 입력값 또는 작업 파일 한 항목)"""
+
+    def __init__(self, user_id: str, password: str, date: dt.date, office_nos: List[int],
+                 preferred_hours: List[str], form_data: dict, *,
+                 engine: str = "browser", race_profile: bool = False, headless: bool = False,
+                 inpage: bool = False, poll_ms: int = 100, adaptive_retry: bool = False,
+                 fire_adj_ms: float = 0.0, hedge: int = 1, hedge_stagger_ms: float = 30.0,
+                 accounts: Optional[List[Tuple[str, str]]] = None, max_per_account: int = 1,
+                 shared_browser: bool = False, burst_interval_ms: float = 20.0, name: Optional[str] = None,
+                 targets: Optional[List[BookingTarget]] = None):
+        self.user_id = user_id
+        self.password = password
+        self.date = date
+        self.office_nos = list(office_nos)
+        self.preferred_hours = list(preferred_hours)
+        self.form_data = form_data
+        self.engine = engine              # "browser" | "http"
+        self.race_profile = race_profile
+        self.headless = headless
+        self.inpage = inpage
+        self.poll_ms = poll_ms
+        self.adaptive_retry = adaptive_retry
+        self.fire_adj_ms = fire_adj_ms
+        self.hedge = max(1, int(hedge))     # 한 면에 같은 제출을 보낼 세션 수 (1 = 끔)
+        self.hedge_stagger_ms = hedge_stagger_ms
+        self.accounts = list(accounts or [])  # 함께 예약할 추가 계정 [(아이디, 비밀번호)]
+        self.max_per_account = max_per_account
+        self.shared_browser = shared_browser  # 추가 세션을 Chrome 하나의 컨텍스트로 (브라우저 엔진)
+        self.burst_interval_ms = burst_interval_ms  # 적응형 재시도의 오픈 직후 간격
+        # (면, 날짜, 시간)을 대상마다 따로 정한 경우. 없으면 office_nos × date × preferred_hours
+        self.targets = sorted(targets, key=lambda t: t.priority) if targets else None
+        if self.targets:
+            # 오픈 대기는 가장 늦게 열리는 날짜 기준 (앞 날짜는 이미 열려 있으면 취소표 노림)
+            self.date = max(t.date for t in self.targets)
+            self.office_nos = list(dict.fromkeys(t.office_no for t in self.targets))
+            self.preferred_hours = list(self.targets[0].preferred_hours)
+        self.name = name or f"{user_id}@{self.date}"
+
+    def booking_targets(self) -> List[BookingTarget]:
+        return self.targets or targets_for_offices(self.office_nos, self.date, self.preferred_hours)
+
+    @classmethod
+    def from_dict(cls, d: dict, password: Optional[str] = None,
+                  accounts: Optional[List[Tuple[str, str]]] = None) -> "BookingJob":
+        """
+        작업 파일 항목 → BookingJob (비밀번호가 없으면 password 인자, 추가 계정은 accounts 인자 사용)
+        "targets": [{"office": 2, "date": "2025-05-02", "hours": [7, 9]}, ...] 로 대상마다 면/날짜/시간 지정
+        (빠진 값은 항목의 office/date/hours, 우선순위는 나열 순서)
+        """
+        hours = [f"{int(h):02d}" for h in d.get("hours", [])]
+        date = dt.date.fromisoformat(d["date"]) if "date" in d else None
+        targets = [
+            BookingTarget(int(t.get("office", d.get("office", 1))),
+                          dt.date.fromisoformat(t["date"]) if "date" in t else date,
+                          [f"{int(h):02d}" for h in t["hours"]] if "hours" in t else hours,
+                          priority=ix)
+            for ix, t in enumerate(d.get("targets", []))
+        ]
+        if any(t.date is None or not t.preferred_hours for t in targets) or (not targets and not (date and hours)):
+            raise ValueError(f"{d.get('name') or d['user_id']}: date/hours 가 필요합니다 (targets 항목마다 또는 작업에)")
+        return cls(
+            user_id=d["user_id"],
+            password=d.get("password") or password or "",
+            date=date or targets[0].date,
+            office_nos=[int(o) for o in d.get("offices", [d.get("office", 1)])],
+            preferred_hours=hours or targets[0].preferred_hours,
+            form_data={
+                "resident": d.get("resident", "관내"),
+                "phone": d["phone"],
+                "companion_count": int(d.get("companion_count", 0)),
+                "companions": list(d.get("companions", [])),
+            },
+            engine=d.get("engine", "http"),
+            race_profile=d.get("race_profile", False),
+            headless=d.get("headless", True),
+            inpage=d.get("inpage", False),
+            poll_ms=int(d.get("poll_ms", 100)),
+            adaptive_retry=d.get("adaptive_retry", False),
+            fire_adj_ms=float(d.get("fire_adj_ms", 0.0)),
+            hedge=int(d.get("hedge", 1)),
+            hedge_stagger_ms=float(d.get("hedge_stagger_ms", 30.0)),
+            accounts=accounts,
+            max_per_account=int(d.get("max_per_account", 1)),
+            shared_browser=d.get("shared_browser", False),
+            burst_interval_ms=float(d.get("burst_interval_ms", 20.0)),
+            name=d.get("name"),
+            targets=targets or None,
+        )
+
+    def open_time(self) -> dt.datetime:
+        return compute_open_time(self.date)
+
+
+class JobResult:
+    """status: success | failed | full(선호 시간 전부 마감) | error"""
+
+    def __init__(self, job: BookingJob, status: str, detail: str = "", office_no: Optional[int] = None,
+                 fire_error_ms: Optional[float] = None, started_at: Optional[dt.datetime] = None,
+                 duplicates: int = 0, wins: Optional[List[tuple]] = None, fire: Optional[dict] = None):
+        self.job = job
+        self.status = status
+        self.detail = detail
+        self.office_no = office_no
+        self.fire_error_ms = fire_error_ms
+        self.started_at = started_at
+        self.duplicates = duplicates        # 중복 제출에서 첫 성공 뒤에 또 성공한 건수
+        self.wins = wins or []              # 여러 계정 실행: [(계정, 면, 시간)]
+        self.fire = fire or {}              # 발사 기록: open_at(epoch), lead_ms, offset_ms, rtt_ms
+        self.finished_at = dt.datetime.now()
+
+    @property
+    def success(self) -> bool:
+        return self.status == "success"
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.job.name,
+            "user_id": self.job.user_id,
+            "date": self.job.date.isoformat(),
+            "offices": self.job.office_nos,
+            "hours": self.job.preferred_hours,
+            "engine": self.job.engine,
+            "status": self.status,
+            "detail": self.detail,
+            "office_no": self.office_no,
+            "fire_error_ms": self.fire_error_ms,
+            "duplicates": self.duplicates,
+            "wins": [{"user_id": u, "office_no": o, "hour": h} for u, o, h in self.wins],
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat(),
+        }
+
+
+# --------- 실행 ---------
+
+def run_job(job: BookingJob, log: Optional[Callable[[str], None]] = None, keep_open: bool = True,
+            driver=None) -> JobResult:
+    """
+    로그인 → 오픈 전 세션 유지/시계 동기화/예열 → 오픈 시각 발사 → (병렬|페이지 내 폴링|재시도) 예약.
+    keep_open=False 면 끝난 뒤 브라우저/세션을 닫는다.
+    driver: 미리 띄워 둔 브라우저가 있으면 넘겨서 재사용 (브라우저 엔진일 때만)
+    """
+    log = log or (lambda msg: None)
+    started_at = dt.datetime.now()
+    handles = []
+    fire_err = None
+    fire = {}
+    opened_by = 0.0   # PC epoch — 이 시각 전에 보낸 시도의 '전부 마감'은 오픈 전 화면일 수 있음
+    try:
+        office_no = job.office_nos[0]
+        log(f"예약 준비: {job.date} (면 {job.office_nos}), 선호시간 {job.preferred_hours}")
+        open_dt = job.open_time()
+        fire["open_at"] = open_dt.timestamp()
+        log(f"예약 오픈 예상 시각: {open_dt} (현재 {dt.datetime.now()})")
+
+        use_http = job.engine == "http"
+        if use_http:
+            engine = http_booking
+            driver = http_booking.HttpClient()
+            log("HTTP 세션 준비 완료")
+        else:
+            engine = booking
+            if driver is None:
+                driver = build_driver(headless=job.headless, profile="race" if job.race_profile else "default")
+            if job.shared_browser:
+                SessionManager(driver)  # 이후 clone_session/추가 계정 세션은 같은 Chrome 의 새 컨텍스트
+            log("브라우저 준비 완료")
+        handles.append(driver)
+        inpage = (not use_http) and job.inpage
+        if job.inpage and use_http:
+            log("[안내] 페이지 내 폴링은 브라우저 엔진 전용 — 새로고침 방식으로 진행")
+
+        # 미리 로그인
+        log("로그인 시도 중...")
+        if engine.login(driver, job.user_id, job.password) is False:
+            log("[경고] 로그인 확인 실패 — 아이디/비밀번호를 확인하세요.")
+        else:
+            log("로그인 완료")
+
+        # 여러 계정이면 계정마다 따로 세션을 만들어 로그인 (복제가 아니라 각자 로그인)
+        team = bool(job.accounts)
+        extra = []  # [(아이디, 비밀번호, handle)]
+        if team:
+            if inpage:
+                log("[안내] 여러 계정 예약은 새로고침 방식으로 진행")
+                inpage = False
+            for uid, pw in job.accounts:
+                if use_http:
+                    h = http_booking.HttpClient()
+                elif job.shared_browser:
+                    h = driver.session_manager.new_session()
+                else:
+                    h = build_driver(headless=job.headless, profile="race" if job.race_profile else "default")
+                handles.append(h)
+                ok = engine.login(h, uid, pw)
+                log(f"[{uid}] 로그인 " + ("실패 — 아이디/비밀번호를 확인하세요" if ok is False else "완료"))
+                extra.append((uid, pw, h))
+            claims = ClaimTable()
+
+        # 여러 대상(면/날짜)이면 대상마다 로그인 세션을 복제해 둔다 (오픈 전에 미리)
+        targets = job.booking_targets()
+        multi = not team and len(targets) > 1
+        if multi:
+            if inpage:
+                log("[안내] 여러 면 동시 예약은 새로고침 방식으로 진행")
+                inpage = False
+            handles += [engine.clone_session(driver) for _ in targets[1:]]
+            log(f"병렬 작업자 {len(handles)}개 준비 완료")
+        hedged = not team and not multi and job.hedge > 1
+        if hedged:
+            if inpage:
+                log("[안내] 중복 제출은 새로고침 방식으로 진행")
+                inpage = False
+            handles += [engine.clone_session(driver) for _ in range(job.hedge - 1)]
+            log(f"중복 제출 세션 {len(handles)}개 준비 완료 ({job.hedge_stagger_ms:.0f}ms 간격)")
+        # 세션 하나로 경쟁할 때는 슬롯 배치 캐시로 첫 시도를 바로 제출 (오픈 전에 다시 읽어 갱신)
+        direct = not (team or multi or hedged or inpage)
+        layout = slot_layout.load(office_no, job.date) if direct else None
+
+        # 오픈 시각까지 대기
+        now = dt.datetime.now()
+        if now < open_dt:
+            log("오픈 시각까지 대기합니다 (세션 유지 중)...")
+            if team:
+                claims.clear(job.date)  # 지난 회차 기록 정리 (점유는 오픈 후에만 생기므로 오픈 전 정리는 안전)
+            # 대기 중 주기적으로 세션 확인, 오픈 3분 전 한 번 더 확인 (복제/추가 계정 세션까지 모두 각자 스레드에서)
+            owners = {id(h): (uid, pw) for uid, pw, h in extra}
+            sessions = []
+            for ix, h in enumerate(handles):
+                uid, pw = owners.get(id(h), (job.user_id, job.password))
+                sessions.append((uid if ix == 0 or id(h) in owners else f"{uid} 세션{ix + 1}", uid, pw, h))
+            keep_all_warm(engine, sessions, open_dt - dt.timedelta(seconds=30),
+                          recheck_at=open_dt - dt.timedelta(minutes=3), log=log)
+            if direct:
+                try:
+                    layout = slot_layout.capture(engine, driver, office_no, job.date) or layout
+                    if layout:
+                        log(f"슬롯 배치 저장: {', '.join(layout.hours())}시")
+                except Exception as e:
+                    log(f"[경고] 슬롯 배치 읽기 실패 ({e}) — " + ("캐시된 배치 사용" if layout else "일반 방식으로 진행"))
+            # 오픈 30초 전에 서버 시계를 다시 재서 드리프트를 줄인다
+            sync = sync_server_clock(driver.session if use_http else None)
+            fire_adj = job.fire_adj_ms / 1000
+            if inpage:
+                log("작성 페이지 미리 열기 + 고정 입력값 채움")
+                booking.preload_write_page(driver, office_no, job.date, job.form_data)
+            # 오픈 3초 전 DNS/연결 예열 (서버 keep-alive 만료 전에 맞춰 늦게)
+            wait_until(open_dt - dt.timedelta(seconds=3), offset=sync.offset if sync else 0.0)
+            prewarm_all(engine, handles, log=log)
+            log("연결 예열 완료")
+            if sync:
+                log(f"서버 시계: offset {sync.offset*1000:+.1f}ms (±{sync.error*1000:.1f}), "
+                    f"RTT {sync.rtt*1000:.1f}ms, jitter {sync.jitter*1000:.1f}ms")
+                # offset 구간의 늦은 끝(lo) 기준으로 쏜다: 실제 offset 이 구간 어디여도 오픈 전에 도착하지 않음
+                lead = sync.rtt / 2 + fire_adj - sync.error
+                fire.update(offset_ms=sync.offset * 1000, rtt_ms=sync.rtt * 1000, lead_ms=lead * 1000)
+                fire_err = wait_until(open_dt, offset=sync.offset, lead=lead)
+                opened_by = open_dt.timestamp() - sync.lo
+            else:
+                log("[경고] 서버 시계 측정 실패 — PC 시각 기준으로 발사")
+                fire.update(offset_ms=0.0, rtt_ms=None, lead_ms=fire_adj * 1000)
+                fire_err = wait_until(open_dt, lead=fire_adj)
+                opened_by = open_dt.timestamp()
+            log(f"오픈 시각 도달! (발사 오차 {fire_err*1000:+.2f}ms)")
+        fire_ms = None if fire_err is None else fire_err * 1000
+
+        def result(status: str, detail: str = "", won_office: Optional[int] = None) -> JobResult:
+            return JobResult(job, status, detail, won_office, fire_ms, started_at, fire=fire)
+
+        if team:
+            teams = {job.user_id: driver, **{uid: h for uid, _, h in extra}}
+            log(f"계정 {len(teams)}개 × 면 {job.office_nos} 슬롯을 나눠서 시도")
+            wins = run_accounts(engine, teams, job.office_nos, job.date, job.preferred_hours, job.form_data,
+                                claims, max_per_account=job.max_per_account, opened_by=opened_by, log=log)
+            if wins:
+                detail = ", ".join(f"{u}: 면{o} {h}:00" for u, o, h in wins)
+                return JobResult(job, "success", detail, wins[0][1], fire_ms, started_at, wins=wins, fire=fire)
+            return result("failed")
+
+        if multi:
+            log(f"대상 {len(targets)}개 동시 시도: {targets}")
+            try:
+                won = run_targets(engine, handles, targets, job.form_data, opened_by=opened_by, log=log)
+            except SubmitUnconfirmed as e:
+                return result("error", f"{e} — 예약 내역을 직접 확인하세요")
+            if won:
+                log(f"성공 대상: {won}")
+                return result("success", str(won), won_office=won.office_no)
+            return result("failed")
+
+        if hedged:
+            hedge = run_hedged(engine, handles, office_no, job.date, job.preferred_hours, job.form_data,
+                               stagger=job.hedge_stagger_ms / 1000, opened_by=opened_by, log=log)
+            dup = len(hedge.duplicates)
+            detail = f"중복 예약 {dup}건 — 사이트에서 취소 필요" if dup else ""
+            if hedge.success:
+                return JobResult(job, "success", detail, office_no, fire_ms, started_at, duplicates=dup, fire=fire)
+            if hedge.unconfirmed:
+                return result("error", f"{hedge.unconfirmed} — 예약 내역을 직접 확인하세요")
+            if hedge.full:
+                return result("full", "선호한 시간대가 모두 예약 불가(disabled)입니다.")
+            return result("failed")
+
+        if inpage:
+            if "write.php" not in driver.current_url:
+                booking.preload_write_page(driver, office_no, job.date, job.form_data)
+            log(f"페이지 내 폴링 시작 ({job.poll_ms}ms 간격)")
+            ok = booking.inpage_race(driver, job.preferred_hours, job.form_data, interval_ms=job.poll_ms)
+            return result("success" if ok else "failed", won_office=office_no if ok else None)
+
+        # 1차 시도
+        success = None
+        first_at = time.time()
+        try:
+            if layout:
+                log("캐시된 슬롯 배치로 바로 제출...")
+                success = engine.submit_from_layout(driver, layout, office_no, job.date, job.preferred_hours,
+                                                    job.form_data)
+                if success is None:
+                    log("[안내] 캐시된 배치로 제출하지 못함 (페이지 변경/거절) → 작성 페이지에서 다시 찾습니다")
+            else:
+                log("작성 페이지 진입...")
+                engine.open_write_page(driver, office_no, job.date)
+            if success is None:
+                success = engine.try_select_time_and_submit(driver, job.preferred_hours, job.form_data) # preferred times=['07','09',...]
+        except SubmitUnconfirmed as e:
+            # 이미 예약됐을 수 있으므로 다른 시간으로 다시 제출하지 않는다
+            return result("error", f"{e} — 예약 내역을 직접 확인하세요")
+        except NoAvailablePreferredTime as e:
+            if first_at < opened_by:
+                # 서버 시계 오차 범위 안에서 쏜 시도 — 아직 오픈 전 화면일 수 있으니 마감으로 보지 않음
+                log("오픈 직전 화면(전부 마감) — 오픈 확인까지 재시도")
+                success = False
+            elif not job.adaptive_retry:
+                return result("full", str(e))
+            else:
+                # 적응형: 취소로 슬롯이 풀릴 수 있으니 정책이 정한 유예 시간 동안 계속 확인
+                log(f"전부 마감 — 취소 대기 모드로 재시도 ({str(e)})")
+                success = False
+
+        # 빠른 재시도는 '일반 실패'일 때만 수행 (적응형은 전부 마감이어도 유예 시간 동안 수행)
+        if not success:
+            log("1차 실패 → 빠른 재시도 시작")
+            try:
+                policy = (AdaptiveRetry(burst_interval=job.burst_interval_ms / 1000, log=log)
+                          if job.adaptive_retry else FixedRetry(opened_by=opened_by))
+                success = engine.fast_retry_loop(driver, office_no, job.date, job.preferred_hours, job.form_data,
+                                                 policy=policy)
+            except SubmitUnconfirmed as e:
+                return result("error", f"{e} — 예약 내역을 직접 확인하세요")
+            except NoAvailablePreferredTime as e:
+                # 재시도 중에도 전부 disabled인 상태가 확인되면 즉시 중단
+                return result("full", str(e))
+
+        return result("success" if success else "failed", won_office=office_no if success else None)
+
+    except Exception as e:
+        return JobResult(job, "error", str(e), None, None if fire_err is None else fire_err * 1000, started_at,
+                         fire=fire)
+    finally:
+        if not keep_open:
+            # 공유 Chrome 이면 컨텍스트 세션을 먼저 닫고 마지막에 기본 driver(Chrome) 종료
+            for h in reversed(handles):
+                try:
+                    h.quit()
+                except Exception:
+                    pass
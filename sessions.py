@@ -0,0 +1,84 @@
+import threading
+from typing import List
+
+from driver import build_driver, attach_driver, apply_profile
+from tracing import traced
+
+
+# --------- Chrome 하나 + 격리된 브라우저 컨텍스트 여러 개 ---------
+
+class BrowserSession:
+    """
+    공유 Chrome 안의 브라우저 컨텍스트(쿠키/저장소 격리) 하나에 붙은 chromedriver 세션.
+    WebDriver 호출은 그대로 위임하므로 booking.py 함수에 driver 자리로 넘기면 된다.
+    quit() 은 Chrome 을 닫지 않고 이 컨텍스트만 정리한다.
+    """
+
+    def __init__(self, manager: "SessionManager", driver, context_id: str, target_id: str):
+        self._driver = driver
+        self.session_manager = manager
+        self.context_id = context_id
+        self.target_id = target_id
+        self.race_profile = getattr(driver, "race_profile", False)
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def quit(self):
+        self.session_manager.close(self)
+
+
+class SessionManager:
+    """
+    Chrome 을 한 번만 띄우고, 추가 세션은 CDP Target.createBrowserContext 로 만든 컨텍스트에
+    chromedriver 만 새로 붙여 제공 (세션당 Chrome 프로세스/기동 시간 없이 탭 하나 비용).
+    driver: build_driver 로 띄운 기본 세션 (기본 컨텍스트를 그대로 씀)
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.address = driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+        self.profile = "race" if getattr(driver, "race_profile", False) else "default"
+        self.sessions: List[BrowserSession] = []
+        self.lock = threading.Lock()   # 기본 driver 의 CDP 호출은 한 번에 하나씩
+        driver.session_manager = self
+
+    @classmethod
+    def start(cls, headless: bool = False, profile: str = "default") -> "SessionManager":
+        return cls(build_driver(headless=headless, profile=profile))
+
+    @traced("new_session")
+    def new_session(self) -> BrowserSession:
+        """새 컨텍스트 + 빈 탭을 만들고 전용 chromedriver 세션을 붙여 반환"""
+        with self.lock:
+            ctx = self.driver.execute_cdp_cmd("Target.createBrowserContext", {})["browserContextId"]
+            target = self.driver.execute_cdp_cmd(
+                "Target.createTarget", {"url": "about:blank", "browserContextId": ctx})["targetId"]
+        drv = attach_driver(self.address, self.profile)
+        drv.switch_to.window(target)  # chromedriver 의 창 핸들 = CDP targetId
+        apply_profile(drv, self.profile)
+        session = BrowserSession(self, drv, ctx, target)
+        with self.lock:
+            self.sessions.append(session)
+        return session
+
+    def close(self, session: BrowserSession):
+        # 붙은 chromedriver 만 종료 (quit 은 붙어 있는 Chrome 창까지 닫을 수 있음) → 탭/컨텍스트 정리
+        try:
+            session._driver.service.stop()
+        except Exception:
+            pass
+        with self.lock:
+            if session in self.sessions:
+                self.sessions.remove(session)
+            for cmd, params in (("Target.closeTarget", {"targetId": session.target_id}),
+                                ("Target.disposeBrowserContext", {"browserContextId": session.context_id})):
+                try:
+                    self.driver.execute_cdp_cmd(cmd, params)
+                except Exception:
+                    pass
+
+    def quit(self):
+        for session in list(self.sessions):
+            session.quit()
+        self.driver.quit()
@@ -0,0 +1,158 @@
+"""
+오픈 순간 경쟁 시뮬레이션: 대역 서버에 경쟁 클라이언트/부하 지연을 넣고 예약 전략을 그대로 돌려 비교
+
+    python simulate.py --strategies http-fixed http-adaptive http-adaptive-hedge3 --rivals 40 --trials 20
+    python simulate.py --strategies http-adaptive http-adaptive-lead30 http-adaptive-rev --arrival exp:0.25
+
+전략 이름: <엔진>[-fixed|-adaptive][-hedge<N>][-lead<ms>][-rev]
+    엔진: http | browser | race,  lead: 오픈 몇 ms 전에 발사,  rev: 선호 시간 순서를 뒤집음
+시행마다 같은 시드로 경쟁자를 뽑으므로 전략 간 비교는 같은 상황에서 이뤄진다.
+"""
+import os
+import sys
+import time
+import math
+import argparse
+import datetime as dt
+
+from mock_server import MockSite, Rivals, serve, season_hours
+
+
+class Strategy:
+    def __init__(self, name: str):
+        self.name = name
+        parts = name.split("-")
+        self.engine = parts[0]
+        if self.engine not in ("http", "browser", "race"):
+            raise ValueError(f"{name}: 엔진은 http | browser | race")
+        self.retry, self.hedge, self.lead_ms, self.reverse = "fixed", 1, 0.0, False
+        for p in parts[1:]:
+            if p in ("fixed", "adaptive"):
+                self.retry = p
+            elif p.startswith("hedge"):
+                self.hedge = int(p[5:])
+            elif p.startswith("lead"):
+                self.lead_ms = float(p[4:])
+            elif p == "rev":
+                self.reverse = True
+            else:
+                raise ValueError(f"{name}: 알 수 없는 옵션 {p}")
+
+
+def _wilson(wins: int, n: int, z: float = 1.96):
+    """승률 95% 신뢰구간"""
+    if not n:
+        return 0.0, 0.0
+    p = wins / n
+    d = 1 + z * z / n
+    c = p + z * z / (2 * n)
+    r = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n))
+    return (c - r) / d, (c + r) / d
+
+
+def run_strategy(st: Strategy, site: MockSite, args, date: dt.date, hours, form_data, user: str) -> dict:
+    # 대역 서버 주소가 지정된 뒤에만 import (config 가 BASE_URL 을 읽음)
+    from booking import wait_until
+    from jobs import run_hedged
+    from retry_policy import FixedRetry, AdaptiveRetry
+    from utils import NoAvailablePreferredTime
+
+    if st.engine == "http":
+        import http_booking as engine
+        handle = engine.HttpClient()
+    else:
+        import booking as engine
+        from driver import build_driver
+        handle = build_driver(headless=args.headless, profile="race" if st.engine == "race" else "default")
+    handles = [handle]
+    prefs = list(reversed(hours)) if st.reverse else list(hours)
+    times, won_hours = [], []
+    try:
+        engine.login(handle, user, "pw")
+        handles += [engine.clone_session(handle) for _ in range(st.hedge - 1)]
+
+        for trial in range(args.trials):
+            site.reset(open_at=time.time() + args.warmup, seed=args.seed + trial)
+            site.slots(args.office, date)  # 경쟁자 표본을 시드 순서대로 먼저 뽑아 둔다
+            wait_until(dt.datetime.fromtimestamp(site.open_at), lead=st.lead_ms / 1000)
+            try:
+                if st.hedge > 1:
+                    run_hedged(engine, handles, args.office, date, prefs, form_data,
+                               stagger=args.stagger / 1000, retry_seconds=args.retry_seconds)
+                else:
+                    policy = (AdaptiveRetry(duration=args.retry_seconds, full_grace=args.retry_seconds)
+                              if st.retry == "adaptive" else FixedRetry(args.retry_seconds))
+                    engine.fast_retry_loop(handle, args.office, date, prefs, form_data, policy=policy)
+            except NoAvailablePreferredTime:
+                pass
+            mine = [b for b in site.bookings if b[0] == user]
+            if mine:
+                times.append(mine[0][4] - site.open_at)
+                won_hours.append(mine[0][3])
+    finally:
+        for h in reversed(handles):
+            h.quit()
+    return {"times": times, "hours": won_hours}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="예약 전략 경쟁 시뮬레이션 (대역 서버)")
+    ap.add_argument("--strategies", nargs="+", default=["http-fixed", "http-adaptive", "http-adaptive-hedge3"])
+    ap.add_argument("--trials", type=int, default=20)
+    ap.add_argument("--rivals", type=int, default=30, help="(면, 날짜)마다 경쟁 클라이언트 수")
+    ap.add_argument("--arrival", default="normal:0.3,0.2", help="경쟁자 도착 분포: normal:평균,표준편차 | exp:평균 | "
+                                                                "uniform:시작,끝 | fixed:값 (초, 오픈 기준)")
+    ap.add_argument("--popular", nargs="+", help="경쟁자 인기 순 시간 (예: 19 17 07). 기본: 시즌 시간 순")
+    ap.add_argument("--zipf", type=float, default=1.0, help="인기도 쏠림 (0 = 고르게)")
+    ap.add_argument("--hours", nargs="+", help="우리 선호 시간. 기본: 인기 순 앞 3개")
+    ap.add_argument("--latency", type=float, default=20.0, help="기본 지연 ms")
+    ap.add_argument("--jitter", type=float, default=5.0, help="ms")
+    ap.add_argument("--load-latency", type=float, default=3.0, help="동시 클라이언트 1명당 추가 지연 ms")
+    ap.add_argument("--office", type=int, default=1)
+    ap.add_argument("--stagger", type=float, default=30.0, help="hedge 세션 간격 ms")
+    ap.add_argument("--retry-seconds", type=float, default=5.0)
+    ap.add_argument("--warmup", type=float, default=1.0, help="시행마다 오픈까지 대기 초")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--headless", action="store_true")
+    args = ap.parse_args(argv)
+
+    strategies = [Strategy(n) for n in args.strategies]
+    date = dt.date.today() + dt.timedelta(days=15)
+    season = season_hours(date)
+    popular = [f"{int(h):02d}:00" for h in args.popular] if args.popular else season
+    hours = [f"{int(h):02d}" for h in args.hours] if args.hours else [h[:2] for h in popular[:3]]
+
+    site = MockSite(latency=args.latency / 1000, jitter=args.jitter / 1000, seed=args.seed,
+                    rivals=Rivals(args.rivals, args.arrival, popular=popular, zipf=args.zipf),
+                    load_latency=args.load_latency / 1000)
+    server = serve(site)
+    os.environ["TENNIS_BASE_URL"] = server.base_url
+    from bench import percentiles
+    form_data = {"resident": "관내", "phone": "010-1234-5678", "companion_count": 0, "companions": []}
+    print(f"rivals={args.rivals} arrival={args.arrival} latency={args.latency}±{args.jitter}ms "
+          f"+{args.load_latency}ms/client  선호 {hours}  trials={args.trials}")
+
+    rows = []
+    for ix, st in enumerate(strategies):
+        try:
+            res = run_strategy(st, site, args, date, hours, form_data, user=f"sim{ix}")
+        except Exception as e:
+            print(f"{st.name}: 건너뜀 ({e})")
+            continue
+        rows.append((st, res))
+
+    print(f"\n{'strategy':<28} {'win':>9} {'95% CI':>14} {'p50':>9} {'p95':>9}  1지망")
+    for st, res in rows:
+        wins = len(res["times"])
+        lo, hi = _wilson(wins, args.trials)
+        pct = percentiles(res["times"])
+        first = sum(1 for h in res["hours"] if h[:2] == (hours[-1] if st.reverse else hours[0]))
+        p50 = f"{pct['p50']:7.1f}ms" if wins else "       -"
+        p95 = f"{pct['p95']:7.1f}ms" if wins else "       -"
+        print(f"{st.name:<28} {wins:>3}/{args.trials:<5} [{lo:5.2f},{hi:5.2f}] {p50:>9} {p95:>9}  {first}/{wins}")
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
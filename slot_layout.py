@@ -0,0 +1,101 @@
+import os
+import json
+import time
+import datetime as dt
+from typing import Dict, List, NamedTuple, Optional
+
+from config import DATA_DIR
+from slot_parser import SlotPage
+
+
+# --------- 슬롯 배치 캐시 ---------
+# 오픈 전 작성 페이지에서 시간 값/라디오·라벨 id/폼 필드를 한 번 읽어 (면, 날짜, 시즌) 별로 저장해 두고,
+# 오픈 순간에는 그 배치대로 바로 선택·제출한다 (페이지에서 시간 목록을 다시 찾지 않음).
+
+DEFAULT_PATH = os.path.join(DATA_DIR, "slot_layouts.json")
+
+
+def season_of(date: dt.date) -> str:
+    """동절기(11~2월) / 하절기 — 사이트 시간표가 바뀌는 단위"""
+    return "winter" if date.month in (11, 12, 1, 2) else "summer"
+
+
+class SlotLayout(NamedTuple):
+    office_no: int
+    date: str                    # "2025-05-01"
+    season: str                  # season_of(date)
+    slots: List[List[str]]       # [[value, input_id, label_id], ...] 페이지 순서
+    fields: Dict[str, str]       # fwrite 폼 기본 제출값 (hidden 토큰 포함)
+    checkboxes: Dict[str, str]
+    action: Optional[str]
+    captured_at: float           # epoch
+
+    @property
+    def key(self) -> str:
+        return f"{self.office_no}|{self.date}|{self.season}"
+
+    def hours(self) -> List[str]:
+        """["06", "08", ...]"""
+        return [value[:2] for value, _, _ in self.slots]
+
+    def preferred(self, preferred_hours: List[str]) -> List[List[str]]:
+        """선호 순서대로, 페이지에 있는 슬롯만"""
+        by_value = {s[0]: s for s in self.slots}
+        return [by_value[hh + ":00"] for hh in preferred_hours if hh + ":00" in by_value]
+
+
+def from_page(page: SlotPage, office_no: int, date: dt.date) -> SlotLayout:
+    return SlotLayout(
+        office_no=office_no,
+        date=date.isoformat(),
+        season=season_of(date),
+        slots=[[s.value, s.input_id, page.labels.get(s.input_id, "")] for s in page.slots],
+        fields=dict(page.fields),
+        checkboxes=dict(page.checkboxes),
+        action=page.action,
+        captured_at=time.time(),
+    )
+
+
+def _key(office_no: int, date: dt.date) -> str:
+    return f"{office_no}|{date.isoformat()}|{season_of(date)}"
+
+
+def _read(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def load(office_no: int, date: dt.date, path: Optional[str] = None) -> Optional[SlotLayout]:
+    d = _read(path or DEFAULT_PATH).get(_key(office_no, date))
+    return SlotLayout(**d) if d else None
+
+
+def save(layout: SlotLayout, path: Optional[str] = None, keep_days: int = 30):
+    """저장 (예약일이 keep_days 넘게 지난 항목은 정리)"""
+    path = path or DEFAULT_PATH
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    cutoff = (dt.date.today() - dt.timedelta(days=keep_days)).isoformat()
+    data = {k: v for k, v in _read(path).items() if v.get("date", "") >= cutoff}
+    data[layout.key] = layout._asdict()
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def capture(engine, handle, office_no: int, date: dt.date, path: Optional[str] = None) -> Optional[SlotLayout]:
+    """
+    작성 페이지를 열어 배치를 읽고 저장 (오픈 전 대기 중에 호출). #booking_time 이 없으면 None
+    engine: booking 또는 http_booking 모듈
+    """
+    engine.open_write_page(handle, office_no, date)
+    page = engine.read_slots(handle, full_form=True)
+    if page is None or not page.slots:
+        return None
+    layout = from_page(page, office_no, date)
+    save(layout, path)
+    return layout
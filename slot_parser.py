@@ -0,0 +1,212 @@
+import re
+import codecs
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+
+# --------- 결과 구조 ---------
+
+class Slot(NamedTuple):
+    """#booking_time 의 wr_2 라디오 하나"""
+    value: str          # "06:00"
+    enabled: bool       # input 에 disabled 속성이 없음
+    li_disabled: bool   # 감싼 <li> 에 disabled 클래스
+    input_id: str       # label[for] 클릭용 id (없으면 "")
+
+    @property
+    def hour(self) -> str:
+        return self.value[:2]
+
+    @property
+    def available(self) -> bool:
+        return self.enabled and not self.li_disabled
+
+
+class SlotPage(NamedTuple):
+    slots: List[Slot]
+    fields: Dict[str, str]   # fwrite 폼 기본 제출값 (stop_early 면 #booking_time 앞의 hidden 토큰까지만)
+    checkboxes: Dict[str, str]  # 체크박스 name → value (체크 안 된 것 포함: 동의 체크 등)
+    action: Optional[str]    # fwrite action
+    complete: bool           # 폼 끝까지 읽었는지
+    labels: Dict[str, str]   # #booking_time 안 label[for] → label id (id 없는 라벨은 "")
+
+    def available(self) -> Dict[str, bool]:
+        """{"06:00": 예약가능여부} (monitor 스냅샷 형식)"""
+        return {s.value: s.available for s in self.slots}
+
+    def find(self, value: str) -> Optional[Slot]:
+        for s in self.slots:
+            if s.value == value:
+                return s
+        return None
+
+
+# --------- 파서 ---------
+
+class _Done(Exception):
+    pass
+
+
+_SKIP_INPUT_TYPES = ("submit", "button", "image", "file", "reset")
+
+
+class _SlotParser(HTMLParser):
+    """fwrite 폼 필드와 #booking_time 라디오만 모으는 스트리밍 파서 (나머지 태그는 무시)"""
+
+    def __init__(self, stop_early: bool):
+        super().__init__(convert_charrefs=True)
+        self.stop_early = stop_early
+        self.slots: List[Slot] = []
+        self.fields: Dict[str, str] = {}
+        self.checkboxes: Dict[str, str] = {}
+        self.labels: Dict[str, str] = {}
+        self.action: Optional[str] = None
+        self.in_form = False
+        self.form_done = False
+        self.box_depth = 0          # #booking_time 안의 <ul> 깊이 (0 = 밖)
+        self.box_seen = False
+        self.li_disabled: List[bool] = []
+        self.select: Optional[str] = None
+        self.select_first: Optional[str] = None
+        self.option_value: Optional[str] = None
+        self.option_text: List[str] = []
+        self.option_selected = False
+        self.textarea: Optional[str] = None
+        self.text: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        a = dict(attrs)
+        if tag == "form":
+            if a.get("id") == "fwrite" or a.get("name") == "fwrite":
+                self.in_form = True
+                self.action = a.get("action")
+            return
+        if tag == "ul":
+            if self.box_depth:
+                self.box_depth += 1
+            elif a.get("id") == "booking_time":
+                self.box_depth = 1
+                self.box_seen = True
+            return
+        if tag == "li" and self.box_depth:
+            self.li_disabled.append("disabled" in (a.get("class") or "").split())
+            return
+        if tag == "label" and self.box_depth and a.get("for"):
+            self.labels[a["for"]] = a.get("id") or ""
+            return
+        if tag == "input":
+            self._input(a)
+            return
+        if not self.in_form:
+            return
+        if tag == "select" and a.get("name") and "disabled" not in a:
+            self.select, self.select_first = a["name"], None
+        elif tag == "option" and self.select:
+            self.option_value, self.option_text = a.get("value"), []
+            self.option_selected = "selected" in a
+        elif tag == "textarea" and a.get("name") and "disabled" not in a:
+            self.textarea, self.text = a["name"], []
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def _input(self, a: dict):
+        name = a.get("name")
+        typ = (a.get("type") or "text").lower()
+        if self.box_depth and name == "wr_2" and typ == "radio":
+            self.slots.append(Slot(
+                value=a.get("value") or "",
+                enabled="disabled" not in a,
+                li_disabled=bool(self.li_disabled) and self.li_disabled[-1],
+                input_id=a.get("id") or "",
+            ))
+            return
+        if not self.in_form or not name or "disabled" in a or typ in _SKIP_INPUT_TYPES:
+            return
+        if typ == "checkbox":
+            self.checkboxes[name] = a.get("value") or "on"
+        if typ in ("radio", "checkbox"):
+            if "checked" in a:
+                self.fields[name] = a.get("value") or "on"
+        else:
+            self.fields[name] = a.get("value") or ""
+
+    def handle_data(self, data):
+        if self.textarea:
+            self.text.append(data)
+        elif self.select and self.option_value is None:
+            self.option_text.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "ul" and self.box_depth:
+            self.box_depth -= 1
+            if not self.box_depth and self.stop_early:
+                raise _Done
+        elif tag == "li" and self.box_depth and self.li_disabled:
+            self.li_disabled.pop()
+        elif tag == "option" and self.select:
+            value = self.option_value if self.option_value is not None else "".join(self.option_text).strip()
+            if self.select_first is None:
+                self.select_first = value
+            if self.option_selected:
+                self.fields[self.select] = value
+            self.option_value, self.option_text = None, []
+        elif tag == "select" and self.select:
+            self.fields.setdefault(self.select, self.select_first or "")
+            self.select = None
+        elif tag == "textarea" and self.textarea:
+            self.fields[self.textarea] = "".join(self.text)
+            self.textarea = None
+        elif tag == "form" and self.in_form:
+            self.in_form = False
+            self.form_done = True
+            if self.box_seen or not self.stop_early:
+                raise _Done
+
+
+_START_RE = re.compile(r'<form[^>]*\bid=["\']?fwrite|<ul[^>]*\bid=["\']?booking_time', re.I)
+
+
+def parse_slots(html: Union[str, bytes, Iterable[bytes]], *, stop_early: bool = True,
+                encoding: str = "utf-8") -> Optional[SlotPage]:
+    """
+    작성 페이지에서 #booking_time 라디오와 fwrite 폼 값만 추출 (전체 DOM 트리를 만들지 않음).
+    - html: 문자열 / bytes / 바이트 청크 이터러블 (requests iter_content 등, 다 읽기 전에 멈출 수 있음)
+    - stop_early: #booking_time 을 다 읽으면 바로 멈춘다 (fields 는 그 앞의 hidden 토큰까지만).
+      False 면 폼 끝까지 읽어 제출용 기본값 전체를 모은다.
+    #booking_time 이 없으면 None
+    """
+    p = _SlotParser(stop_early)
+    try:
+        if isinstance(html, (str, bytes)):
+            text = html.decode(encoding, "replace") if isinstance(html, bytes) else html
+            m = _START_RE.search(text)
+            if m is None:
+                return None
+            p.feed(text[m.start():])
+        else:
+            # 폼/#booking_time 시작 전까지는 HTMLParser 를 거치지 않고 버퍼에서 정규식으로만 찾는다
+            decoder = codecs.getincrementaldecoder(encoding)("replace")
+            head, started = "", False
+            for chunk in html:
+                text = decoder.decode(chunk)
+                if started:
+                    p.feed(text)
+                    continue
+                scan_from = max(0, len(head) - 64)  # 청크 경계에 걸친 태그
+                head += text
+                m = _START_RE.search(head, scan_from)
+                if m:
+                    started = True
+                    p.feed(head[m.start():])
+                else:
+                    head = head[scan_from:]
+            if not started:
+                return None
+            p.feed(decoder.decode(b"", final=True))
+        p.close()
+    except _Done:
+        pass
+    if not p.box_seen:
+        return None
+    return SlotPage(p.slots, p.fields, p.checkboxes, p.action, p.form_done, p.labels)
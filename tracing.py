@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import threading
+import statistics
+import datetime as dt
+import functools
+import contextvars
+from contextlib import contextmanager
+from typing import Optional
+
+from config import DATA_DIR
+
+
+# --------- 실행 단위 추적 ---------
+# 단계별 소요 시간을 perf_counter_ns 로 기록하고 실행이 끝나면 JSONL 로 남긴다.
+# 실행 중이 아닐 때(start_run 전)는 기록하지 않는다.
+# 현재 실행은 contextvar 로 잡으므로 GUI/CLI 에서 동시에 돌린 실행끼리 섞이지 않는다.
+# 새 스레드는 빈 컨텍스트로 시작하므로, 실행 안에서 띄우는 작업은 bind() 로 감싸 넘길 것.
+
+class RunTrace:
+    def __init__(self, **meta):
+        self.meta = meta
+        self.started_at = dt.datetime.now()
+        self.t0 = time.perf_counter_ns()
+        self.records = []
+        self.lock = threading.Lock()
+
+    def _add(self, rec: dict):
+        rec["thread"] = threading.current_thread().name
+        with self.lock:
+            self.records.append(rec)
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        rec = {"type": "span", "name": name, **attrs}
+        t0 = time.perf_counter_ns()
+        try:
+            yield rec
+        except BaseException as e:
+            rec["error"] = type(e).__name__
+            raise
+        finally:
+            t1 = time.perf_counter_ns()
+            rec["start_ms"] = (t0 - self.t0) / 1e6
+            rec["dur_ms"] = (t1 - t0) / 1e6
+            self._add(rec)
+
+    def event(self, name: str, **attrs):
+        self._add({"type": "event", "name": name, "start_ms": (time.perf_counter_ns() - self.t0) / 1e6, **attrs})
+
+    def summary(self) -> dict:
+        """{단계: {"n", "p50", "max", "total"}} (ms)"""
+        by_name = {}
+        for rec in self.records:
+            if rec["type"] == "span":
+                by_name.setdefault(rec["name"], []).append(rec["dur_ms"])
+        return {
+            name: {"n": len(v), "p50": statistics.median(v), "max": max(v), "total": sum(v)}
+            for name, v in by_name.items()
+        }
+
+    def export_jsonl(self, path: Optional[str] = None) -> str:
+        if path is None:
+            os.makedirs(os.path.join(DATA_DIR, "traces"), exist_ok=True)
+            path = os.path.join(DATA_DIR, "traces", f"run-{self.started_at:%Y%m%d-%H%M%S}.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"type": "run", "started_at": self.started_at.isoformat(), **self.meta},
+                               ensure_ascii=False, default=str) + "\n")
+            for rec in self.records:
+                f.write(json.dumps(rec, ensure_ascii=False, default=str) + "\n")
+        return path
+
+
+class _NullTrace(RunTrace):
+    def _add(self, rec: dict):
+        pass
+
+
+_NULL = _NullTrace()
+_current: contextvars.ContextVar = contextvars.ContextVar("tracing_run", default=_NULL)
+
+
+def start_run(**meta) -> RunTrace:
+    run = RunTrace(**meta)
+    _current.set(run)
+    return run
+
+
+def end_run() -> RunTrace:
+    run = _current.get()
+    _current.set(_NULL)
+    return run
+
+
+def current() -> RunTrace:
+    return _current.get()
+
+
+def bind(fn):
+    """지금 실행 중인 트레이스에 기록하도록 fn 을 감쌈 (ThreadPoolExecutor/Thread 에 넘길 때)"""
+    run = _current.get()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _current.set(run)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return wrapper
+
+
+def span(name: str, **attrs):
+    return _current.get().span(name, **attrs)
+
+
+def event(name: str, **attrs):
+    _current.get().event(name, **attrs)
+
+
+def traced(name: str):
+    """함수 호출 전체를 span 으로 기록하는 데코레이터"""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _current.get().span(name) as rec:
+                out = fn(*args, **kwargs)
+                if isinstance(out, bool):
+                    rec["ok"] = out
+                return out
+        return wrapper
+    return deco
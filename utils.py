@@ -3,3 +3,13 @@ class NoAvailablePreferredTime(Exception):
     """선호 시간들이 모두 예약 불가(disabled)일 때 발생"""
     pass
 
+
+class SubmitUnconfirmed(Exception):
+    """제출은 보냈지만 성공/거절을 알 수 없을 때 (다른 시간으로 다시 제출하면 중복 예약 위험)"""
+    pass
+
+
+class LoginRequired(RuntimeError):
+    """세션이 풀려 작성 페이지 대신 '회원만 이용' 안내가 왔을 때"""
+    pass
+
@@ -0,0 +1,95 @@
+import time
+import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+import tracing
+
+
+# --------- 오픈 전 세션 유지 ---------
+
+def ensure_login(engine, handle, user_id: str, password: str, *, label: str = "",
+                 log: Optional[Callable[[str], None]] = None) -> bool:
+    """로그인 상태를 확인하고 풀렸으면 다시 로그인. 세션이 살아 있거나 재로그인에 성공하면 True"""
+    log = log or (lambda msg: None)
+    prefix = f"[{label}] " if label else ""
+    with tracing.span("keepalive", label=label) as rec:
+        try:
+            rec["alive"] = engine.check_login(handle)
+        except Exception as e:
+            rec["alive"] = False
+            log(f"{prefix}[경고] 세션 확인 실패: {e}")
+        if rec["alive"]:
+            return True
+        log(f"{prefix}세션이 끊겨 다시 로그인합니다")
+        if engine.login(handle, user_id, password) is False:
+            log(f"{prefix}재로그인 실패 — 계정 상태를 확인하세요")
+            return False
+        return True
+
+
+def keep_session_warm(
+    engine,
+    handle,
+    user_id: str,
+    password: str,
+    until_dt: dt.datetime,
+    *,
+    recheck_at: Optional[dt.datetime] = None,
+    keepalive: float = 240,
+    label: str = "",
+    log: Optional[Callable[[str], None]] = None,
+):
+    """
+    until_dt 까지 대기하면서
+    - keepalive 초마다 로그인 상태를 확인(겸 keep-alive 요청), 풀렸으면 다시 로그인
+    - recheck_at 이 되면 주기와 상관없이 한 번 더 확인 (오픈 직전에 세션이 살아 있도록)
+    로그아웃 후 새로 로그인하지는 않는다 — 복제 세션(clone_session)은 같은 서버 세션을 쓰므로
+    하나가 로그아웃하면 나머지도 끊긴다.
+    engine: booking 또는 http_booking 모듈
+    """
+    next_ping = time.time() + keepalive
+    rechecked = recheck_at is None
+
+    while True:
+        now = dt.datetime.now()
+        remaining = (until_dt - now).total_seconds()
+        if remaining <= 0:
+            return
+
+        due = not rechecked and now >= recheck_at
+        if due or time.time() >= next_ping:
+            rechecked = rechecked or due
+            ensure_login(engine, handle, user_id, password, label=label, log=log)
+            next_ping = time.time() + keepalive
+
+        time.sleep(min(1.0, remaining))
+
+
+def keep_all_warm(engine, sessions: list, until_dt: dt.datetime, *, recheck_at: Optional[dt.datetime] = None,
+                  log: Optional[Callable[[str], None]] = None):
+    """
+    sessions = [(이름, 아이디, 비밀번호, handle)] 전부를 각자 스레드에서 keep_session_warm.
+    한 세션의 예외는 로그만 남기고 나머지는 계속 유지한다.
+    """
+    log = log or (lambda msg: None)
+    with ThreadPoolExecutor(max_workers=max(1, len(sessions))) as pool:
+        futures = {pool.submit(tracing.bind(keep_session_warm), engine, h, uid, pw, until_dt,
+                               recheck_at=recheck_at, label=name, log=log): name
+                   for name, uid, pw, h in sessions}
+        for fut, name in futures.items():
+            try:
+                fut.result()
+            except Exception as e:
+                log(f"[{name}] [경고] 세션 유지 중단: {e}")
+
+
+def prewarm_all(engine, handles: list, log: Optional[Callable[[str], None]] = None):
+    """오픈 직전 모든 작업자 세션의 DNS/연결을 미리 열어 둔다 (실패해도 진행)"""
+    log = log or (lambda msg: None)
+    for handle in handles:
+        with tracing.span("prewarm"):
+            try:
+                engine.prewarm(handle)
+            except Exception as e:
+                log(f"[경고] 연결 예열 실패: {e}")